@@ -9,6 +9,7 @@ import tornado
 import urllib3
 from .fakes.FakeApi import FakeApi
 import tornado_openapi as openapi
+from tornado_openapi.PathTemplate import PathTemplate
 
 @fact
 async def deliversSwaggerJson() -> None:
@@ -220,3 +221,37 @@ async def oasMatchesSetup() -> None:
     assert oas.paths['/api/v2/fakes/{id}?name={name}'].put.responses['204'].content is None
     assert oas.paths['/api/v2/fakes/{id}?name={name}'].put.responses['default'] is not None
     assert oas.paths['/api/v2/fakes/{id}?name={name}'].put.responses['default'].content is None
+
+@fact
+def resolvesOperationMetadata() -> None:
+    """Confirm that operation metadata is resolved once per handler class, and again only when metadata changes."""
+
+    metaManager = openapi.MetaManager.instance()
+    operation = metaManager.operationFor(FakeApi, 'post')
+    assert operation.handler is FakeApi
+    assert operation.method == 'post'
+    assert operation.tags == ['FakeApi']
+    assert list(operation.headers.keys()) == ['Rumple-Stiltskin']
+    assert operation.requestBody is not None
+    assert '200' in operation.responses.asDictionary()
+    # falls back to the security requirements of the class
+    assert operation.security == metaManager.security[FakeApi]
+    assert metaManager.operationFor(FakeApi, 'get').security != operation.security
+    assert metaManager.operationFor(FakeApi, 'patch') is None
+    assert metaManager.operationFor(FakeApi, 'post') is operation
+    metaManager.invalidate()
+    assert metaManager.operationFor(FakeApi, 'post') is not operation
+
+@fact
+def parameterizesPathTemplates() -> None:
+    """Confirm that path regexes are parameterized correctly for nested groups, alternations and escaped parentheses."""
+
+    template = PathTemplate.forPattern(r'/api/v2/fakes/(?P<id>\d+)?name=(?P<name>[^/][\dA-Za-z]+)$')
+    assert PathTemplate.forPattern(r'/api/v2/fakes/(?P<id>\d+)?name=(?P<name>[^/][\dA-Za-z]+)$') is template
+    assert template.bind(['id', 'name'], ['id', 'name']) == (True, '/api/v2/fakes/{id}?name={name}', {'name'})
+    # nested captures are bound, but only the outermost capture is rendered
+    assert PathTemplate.forPattern(r'/a/(?P<outer>x(?P<inner>\d+|y))/b$').bind([], ['outer', 'inner']) == (True, '/a/{outer}/b', set())
+    # escaped parentheses are literal text, not captures
+    assert PathTemplate.forPattern(r'/a/\(b\)/((?:c|\))+)$').bind(['id'], ['id']) == (True, '/a/(b)/{id}', set())
+    assert PathTemplate.forPattern(r'/a/(\d+)/(\d+)$').bind(['id'], ['id'])[0] == False
+    assert PathTemplate.forPattern(r'/a/(?:bb|cc)/?$').bind([], []) == (True, '/a/(?:bb|cc)/', set())
@@ -0,0 +1,452 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import json
+from punit import *
+import threading
+import tornado
+import urllib3
+from .fakes.FakeApi import FakeApi
+from .fakes.FakeTaggedApi import FakeTaggedApi
+import tornado_openapi as openapi
+from tornado_openapi.OpenApiRouteIndex import OpenApiRouteIndex
+from tornado_openapi.yamlEncoder import yamlEncoder
+
+@fact
+async def cachesDocumentUntilRoutesChange() -> None:
+    """Confirm that the OAS document is built once, and rebuilt only when the route table changes."""
+
+    app = tornado.web.Application()
+    app.listen(port=3458, address='127.0.0.1')
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Cache', version='v2'))\
+        .filter(lambda e: e in ['FakeApi'])\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi)
+    ])
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3458/api/v2/swagger.json')
+        first = json.loads(await response.data)
+        document = config.cache.document
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3458/api/v2/swagger.json')
+        second = json.loads(await response.data)
+        # served from cache, no rebuild
+        assert config.cache.document is document
+        assert first == second
+        assert len(first['paths']) == 1
+
+        # adding a route invalidates the cached document
+        app.add_handlers('.*', [
+            (r'/api/v2/fakes/(?P<id>\d+)', FakeApi)
+        ])
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3458/api/v2/swagger.json')
+        third = json.loads(await response.data)
+        assert config.cache.document is not document
+        assert len(third['paths']) == 2
+        assert third['paths']['/api/v2/fakes'] == first['paths']['/api/v2/fakes']
+        # documents from prior builds are unaffected by incremental builds
+        assert len(document.oas.paths.asDictionary()) == 1
+
+@fact
+async def revalidatesDocumentWithEtag() -> None:
+    """Confirm that the OAS document carries a strong ETag and conditional requests receive a 304."""
+
+    app = tornado.web.Application()
+    app.listen(port=3459, address='127.0.0.1')
+    openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='ETag', version='v2'))\
+        .cacheControl('public, max-age=60')\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi)
+    ])
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3459/api/v2/swagger.json')
+        await response.data
+        assert response.status == 200
+        etag = response.headers['Etag']
+        assert etag.startswith('"') and etag.endswith('"')
+        assert response.headers['Cache-Control'] == 'public, max-age=60'
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3459/api/v2/swagger.json', headers={ 'If-None-Match': etag })
+        data = await response.data
+        assert response.status == 304
+        assert len(data) == 0
+
+@fact
+async def servesPrecompressedDocument() -> None:
+    """Confirm that a pre-compressed variant of the OAS document is served when the client accepts it."""
+
+    app = tornado.web.Application()
+    app.listen(port=3460, address='127.0.0.1')
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Encoding', version='v2'))\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi),
+        (r'/api/v2/fakes/(?P<id>\d+)', FakeApi)
+    ])
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3460/api/v2/swagger.json', headers={ 'Accept-Encoding': 'gzip' }, decode_content=False)
+        data = await response.data
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert gzip.decompress(data) == config.cache.document.json.content
+        gzipEtag = response.headers['Etag']
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3460/api/v2/swagger.json', headers={ 'Accept-Encoding': 'identity' })
+        data = await response.data
+        assert response.headers.get('Content-Encoding', None) is None
+        assert data == config.cache.document.json.content
+        assert response.headers['Etag'] != gzipEtag
+
+@fact
+async def eagerlyBuildsDocument() -> None:
+    """Confirm that eager mode builds the OAS document before it is first requested."""
+
+    app = tornado.web.Application()
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Eager', version='v2'))\
+        .eager()\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi)
+    ])
+    assert config.cache.document is None
+    # let the IOLoop run the deferred build
+    await asyncio.sleep(0)
+    document = config.cache.document
+    assert document is not None
+    assert document.buildDuration > 0
+    assert not config.cache.isStale(app)
+    assert config.warm(app) is document
+
+@fact
+async def eagerlyBuildsDocumentOnExecutor() -> None:
+    """Confirm that eager mode builds the OAS document on the executor when one is configured."""
+
+    app = tornado.web.Application()
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Eager', version='v2'))\
+        .executor()\
+        .eager()\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi)
+    ])
+    threads = list[threading.Thread]()
+    resolve = config.cache.resolve
+    def recordingResolve(application:tornado.web.Application) -> openapi.OpenApiDocument:
+        threads.append(threading.current_thread())
+        return resolve(application)
+    config.cache.resolve = recordingResolve
+    # let the IOLoop run the deferred build, then wait for the executor to finish it
+    await asyncio.sleep(0)
+    document = await config.warmAsync(app)
+    assert threads == [threads[0]]
+    assert threads[0] is not threading.current_thread()
+    assert document.oas.paths['/api/v2/fakes'] is not None
+    assert not config.cache.isStale(app)
+
+@fact
+def eagerlyBuildsDocumentWithoutRunningLoop() -> None:
+    """Confirm that eager mode builds the OAS document when committed before any IOLoop is running."""
+
+    app = tornado.web.Application()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi)
+    ])
+    def commit() -> openapi.OpenApiConfiguration:
+        return openapi.OpenApiConfigurator(app)\
+            .pattern(r'/api/v2/(swagger.*)')\
+            .info(openapi.objects.Info(title='Eager', version='v2'))\
+            .eager()\
+            .commit()
+    # as a startup script would, before calling `asyncio.run()`
+    with ThreadPoolExecutor(1) as executor:
+        config = executor.submit(commit).result()
+    document = config.cache.document
+    assert document is not None
+    assert document.oas.paths['/api/v2/fakes'] is not None
+    assert not config.cache.isStale(app)
+
+@fact
+async def buildsDocumentOnExecutorOnce() -> None:
+    """Confirm that concurrent requests share a single build when building on an executor."""
+
+    app = tornado.web.Application()
+    app.listen(port=3461, address='127.0.0.1')
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Executor', version='v2'))\
+        .executor()\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi)
+    ])
+    builds = 0
+    resolve = config.cache.resolve
+    def countingResolve(application:tornado.web.Application) -> openapi.OpenApiDocument:
+        nonlocal builds
+        builds += 1
+        return resolve(application)
+    config.cache.resolve = countingResolve
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        async def fetch() -> bytes:
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3461/api/v2/swagger.json')
+            return await response.data
+        results = await asyncio.gather(*[fetch() for i in range(5)])
+    assert builds == 1
+    assert all(e == results[0] for e in results)
+    assert len(json.loads(results[0])['paths']) == 1
+
+@fact
+async def servesYamlDocumentFromExecutor() -> None:
+    """Confirm that a YAML document is serialized once on the executor when one is configured."""
+
+    app = tornado.web.Application()
+    app.listen(port=3475, address='127.0.0.1')
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='YAML Executor', version='v2'))\
+        .filter(lambda e: e in ['FakeApi'])\
+        .executor()\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes/(?P<id>\d+)', FakeApi)
+    ])
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        async def fetch() -> bytes:
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3475/api/v2/swagger.yaml')
+            assert response.headers['Content-Type'] == 'application/yaml'
+            return await response.data
+        results = await asyncio.gather(*[fetch() for i in range(5)])
+    assert all(e == results[0] for e in results)
+    assert results[0] == config.cache.document.yaml.content
+    assert b'\npaths:\n  "/api/v2/fakes/{id}":\n    get:\n' in results[0]
+
+@fact
+def encodesYamlFloatsWithDecimalPoint() -> None:
+    """Confirm that floats are always encoded with a `.`, as YAML 1.1 parsers otherwise read exponent forms back as strings."""
+
+    assert yamlEncoder(1e-05) == b'1.0e-05\n'
+    assert yamlEncoder(1e+20) == b'1.0e+20\n'
+    assert yamlEncoder(1.5e-07) == b'1.5e-07\n'
+    assert yamlEncoder(2.0) == b'2.0\n'
+
+@fact
+async def streamsDocumentInChunks() -> None:
+    """Confirm that a document larger than the chunk size is streamed intact."""
+
+    app = tornado.web.Application()
+    app.listen(port=3462, address='127.0.0.1')
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Streaming', version='v2'))\
+        .chunkSize(256)\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi),
+        (r'/api/v2/fakes/(?P<id>\d+)', FakeApi),
+        (r'/api/v2/fakes/(?P<name>[\dA-Za-z]+)', FakeApi)
+    ])
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3462/api/v2/swagger.json', headers={ 'Accept-Encoding': 'identity' })
+        data = await response.data
+    assert len(config.cache.document.json.content) > 256
+    assert int(response.headers['Content-Length']) == len(data)
+    assert data == config.cache.document.json.content
+
+@fact
+async def servesYamlDocument() -> None:
+    """Confirm that a YAML document is served from the same cached build as the JSON document."""
+
+    app = tornado.web.Application()
+    app.listen(port=3463, address='127.0.0.1')
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='YAML', version='v2'))\
+        .filter(lambda e: e in ['FakeApi'])\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes/(?P<id>\d+)', FakeApi)
+    ])
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3463/api/v2/swagger.yaml')
+        data = (await response.data).decode()
+        assert response.headers['Content-Type'] == 'application/yaml'
+        document = config.cache.document
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3463/api/v2/swagger.json')
+        await response.data
+        assert config.cache.document is document
+        assert response.headers['Etag'] != document.yaml.etag
+    assert data.startswith('openapi: "3.1.1"\n')
+    assert '\npaths:\n  "/api/v2/fakes/{id}":\n    get:\n' in data
+    assert '      tags:\n        - FakeApi\n' in data
+    assert '        - name: id\n          schema:\n            type: number\n' in data
+    assert '          in: path\n' in data
+    assert '      security:\n        - {}\n' in data
+    assert '                "$ref": "#/components/schemas/tests.fakes.FakeApi.FakeObj"\n' in data
+
+@fact
+async def prebuildsAndFreezesDocument() -> None:
+    """Confirm that a prebuilt document is fully serialized and no longer tracks route changes."""
+
+    app = tornado.web.Application()
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Prebuild', version='v2'))\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi)
+    ])
+    document = config.prebuild(app, freezeGarbageCollector=False)
+    assert config.cache.isFrozen
+    assert document.yaml is not None
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes/(?P<id>\d+)', FakeApi)
+    ])
+    assert not config.cache.isStale(app)
+    assert config.cache.resolve(app) is document
+    config.cache.invalidate()
+    assert not config.cache.isFrozen
+    assert config.cache.resolve(app) is not document
+
+@fact
+async def filtersDocumentByQuery() -> None:
+    """Confirm that `tags` and `paths` query arguments select a (pruned) sub-document of the cached document."""
+
+    app = tornado.web.Application()
+    app.listen(port=3474, address='127.0.0.1')
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Filters', version='v2'))\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi),
+        (r'/api/v2/fakes/(?P<id>\d+)', FakeApi),
+        (r'/api/v2/tagged', FakeTaggedApi)
+    ])
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3474/api/v2/swagger.json?tags=Tagged')
+        tagged = json.loads(await response.data)
+        assert list(tagged['paths'].keys()) == ['/api/v2/tagged']
+        assert sorted(tagged['components']['schemas'].keys()) == ['tests.fakes.FakeApi.FakeObj', 'tests.fakes.FakeTaggedApi.FakeTaggedObj']
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3474/api/v2/swagger.json?paths=/api/v2/fakes')
+        fakes = json.loads(await response.data)
+        assert sorted(fakes['paths'].keys()) == ['/api/v2/fakes', '/api/v2/fakes/{id}']
+        assert 'tests.fakes.FakeTaggedApi.FakeTaggedObj' not in fakes['components']['schemas']
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3474/api/v2/swagger.json?tags=FakeApi,Tagged&paths=/api/v2/fakes/{id}')
+        both = json.loads(await response.data)
+        assert list(both['paths'].keys()) == ['/api/v2/fakes/{id}']
+        assert list(both['components']['schemas'].keys()) == ['tests.fakes.FakeApi.FakeObj']
+        etag = response.headers['Etag']
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3474/api/v2/swagger.json?tags=FakeApi,Tagged&paths=/api/v2/fakes/{id}', headers={ 'If-None-Match': etag })
+        await response.data
+        assert response.status == 304
+        # equivalent selections share one sub-document, however they are spelled
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3474/api/v2/swagger.json?tags=FakeApi,Tagged,Missing&paths=/api/v2/fakes/{id},/x1', headers={ 'If-None-Match': etag })
+        await response.data
+        assert response.status == 304
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3474/api/v2/swagger.json')
+        assert len(json.loads(await response.data)['paths']) == 3
+
+    document = config.cache.document
+    assert document.select(['Tagged']) is document.select(tags=['Tagged'])
+    assert document.select(paths=['/api/v2/fakes/']) is document.select(paths=['/api/v2/fakes'])
+    assert document.select(tags=['Tagged', 'Missing']) is document.select(tags=['Tagged'])
+    assert document.select(paths=['/', '/x1']) is document.select(paths=['/', '/x2'])
+    assert document.select(paths=['/api/v2/fakes']) is document.select(paths=['/api/v2/fakes/{id}', '/api/v2/fakes'])
+
+@fact
+async def sharesRouteScanAcrossConfigurations() -> None:
+    """Confirm that configurations describing the same application share one route scan, each applying its own filter."""
+
+    app = tornado.web.Application()
+    v2 = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Shared', version='v2'))\
+        .filter(lambda e: e in ['FakeApi'])\
+        .commit()
+    internal = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/internal/(swagger.*)')\
+        .info(openapi.objects.Info(title='Shared', version='internal'))\
+        .filter(lambda e: e in ['Tagged'])\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi),
+        (r'/internal/tagged', FakeTaggedApi)
+    ])
+    index = OpenApiRouteIndex.forApplication(app)
+    assert OpenApiRouteIndex.forApplication(app) is index
+    v2Paths = v2.cache.resolve(app).oas.asDictionary()['paths']
+    generation, operations = index.scan()
+    internalPaths = internal.cache.resolve(app).oas.asDictionary()['paths']
+    # the second configuration did not scan the routes again
+    assert index.scan()[0] == generation
+    assert index.scan()[1] is operations
+    assert len(operations) == 2
+    assert list(v2Paths.keys()) == ['/api/v2/fakes']
+    assert list(internalPaths.keys()) == ['/internal/tagged']
+    assert internalPaths['/internal/tagged']['get']['tags'] == ['Tagged']
+    # operations in the index are shared, and are not modified by configurations
+    assert all('tags' not in operation.asDictionary() for _,_,operation,_,_ in operations)
+
+@fact
+def convertsOnlyRulesAffectedByMetadataChanges() -> None:
+    """Confirm that decorating a handler after a build does not convert every rule again, only those targeting the handler."""
+
+    app = tornado.web.Application()
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Plugins', version='v2'))\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi),
+        (r'/api/v2/tagged', FakeTaggedApi)
+    ])
+    index = OpenApiRouteIndex.forApplication(app)
+    config.cache.resolve(app)
+    generation, operations = index.scan()
+    count = len(operations)
+
+    # as a plugin module would be, when imported at runtime
+    @openapi.api('Plugin')
+    class FakePluginApi(tornado.web.RequestHandler):
+        @openapi.response(204, description='Success')
+        async def delete(self) -> None:
+            pass
+
+    assert index.scan()[0] == generation
+    app.add_handlers('.*', [
+        (r'/api/v2/plugin', FakePluginApi)
+    ])
+    document = config.cache.resolve(app)
+    assert index.scan()[0] == generation
+    assert document.oas.paths['/api/v2/plugin'].delete is not None
+    assert document.tags == ['FakeApi', 'Plugin', 'Tagged']
+
+    # decorating a routed handler converts only the rules targeting it
+    openapi.response(404, description='Not Found')(FakePluginApi.delete)
+    updatedGeneration, updatedOperations = index.scan()
+    assert updatedGeneration == generation + 1
+    # operations of other rules are reused as-is
+    assert all(a is b for a,b in zip(updatedOperations[:count], operations[:count]))
+    assert updatedOperations[count] is not operations[count]
+    document = config.cache.resolve(app)
+    assert document.oas.paths['/api/v2/plugin'].delete.responses['404'] is not None
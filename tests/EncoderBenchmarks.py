@@ -0,0 +1,78 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+#
+# Benchmarks comparing JSON encoders on a synthetic, large OAS document. These
+# are excluded from build-time tests, run them explicitly with:
+#
+#   python -m punit --trait longrunning
+##
+
+import json
+import time
+from typing import Any, Callable
+from punit import *
+import tornado_openapi as openapi
+from tornado_openapi.OpenApiConfiguration import compactJsonEncoder
+
+def _createSyntheticDocument(pathCount:int) -> dict[str,Any]:
+    paths = openapi.objects.Paths()
+    for i in range(pathCount):
+        paths[f'/api/v2/resource{i}/{{id}}'] = openapi.objects.PathItem(
+            get=openapi.objects.Operation(
+                tags=[f'Tag{i % 90}'],
+                parameters=[
+                    openapi.objects.Parameter(
+                        name='id',
+                        location=openapi.objects.ParameterLocation.PATH,
+                        required=True,
+                        schema=openapi.MetaManager.instance().getSchemaForType(int)
+                    )
+                ],
+                responses=openapi.objects.Responses({
+                    '200': openapi.objects.Response(
+                        description=f'Résumé of resource {i}',
+                        content={
+                            'application/json': openapi.objects.MediaType(
+                                schema=openapi.objects.Reference(ref=f'#/components/schemas/Resource{i}')
+                            )
+                        }
+                    )
+                })
+            )
+        )
+    oas = openapi.objects.OpenAPI(
+        info=openapi.objects.Info(title='Synthetic', version='v2'),
+        paths=paths
+    )
+    return oas.asDictionary()
+
+def _measure(encoder:Callable[[Any],bytes], d:dict[str,Any], iterations:int) -> tuple[float,int]:
+    size = len(encoder(d))
+    started = time.perf_counter()
+    for i in range(iterations):
+        encoder(d)
+    return ((time.perf_counter() - started) / iterations, size)
+
+@fact
+@trait('longrunning')
+def compareJsonEncoders() -> None:
+    """Compare the default (compact) JSON encoder against the prior ``json.dumps`` defaults, and ``orjson`` when it is installed."""
+
+    d = _createSyntheticDocument(5000)
+    encoders:dict[str,Callable[[Any],bytes]] = {
+        'json.dumps (defaults)': lambda e: json.dumps(e).encode(),
+        'compactJsonEncoder': compactJsonEncoder
+    }
+    try:
+        import orjson
+        encoders['orjson.dumps'] = orjson.dumps
+    except ImportError:
+        pass
+    results = { name:_measure(encoder, d, 10) for name,encoder in encoders.items() }
+    for name,(elapsed,size) in results.items():
+        print(f'{name:>24}: {elapsed*1000:8.2f}ms {size:>10} bytes')
+    # all encoders must produce equivalent documents
+    expected = json.loads(compactJsonEncoder(d))
+    for encoder in encoders.values():
+        assert json.loads(encoder(d)) == expected
+    assert results['compactJsonEncoder'][1] < results['json.dumps (defaults)'][1]
@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+import gzip
+import json
+import os
+import tempfile
+from punit import *
+import tornado
+import urllib3
+import tornado_openapi as openapi
+from tornado_openapi.__main__ import main
+from tornado_openapi.OpenApiConfiguration import gzipEncoder
+
+@fact
+def exportsDocumentToDisk() -> None:
+    """Confirm that the ``export`` command writes an OAS document, and its compressed variants, for an application factory."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'swagger.json')
+        assert main(['export', 'tests.fakes.FakeApp:createApplication', '-o', output, '--compress', '--quiet']) == 0
+        with open(output, 'rb') as file:
+            content = file.read()
+        with open(output + '.gz', 'rb') as file:
+            assert gzip.decompress(file.read()) == content
+        result = json.loads(content)
+        assert result['info']['title'] == 'FakeApp'
+        assert len(result['paths']) == 4
+
+@fact
+async def servesPrebuiltDocument() -> None:
+    """Confirm that a prebuilt document, and its pre-compressed sidecar, are served without interrogating routes."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'swagger.json')
+        assert main(['export', 'tests.fakes.FakeApp:createApplication', '-o', output, '--compress', '--quiet']) == 0
+        with open(output, 'rb') as file:
+            expected = file.read()
+
+        # NOTE: no handlers are added, the document can only come from disk
+        app = tornado.web.Application()
+        app.listen(port=3464, address='127.0.0.1')
+        config = openapi.OpenApiConfigurator(app)\
+            .pattern(r'/api/v2/(swagger.*)')\
+            .prebuilt(output)\
+            .commit()
+        async with urllib3.AsyncPoolManager() as async_urllib3:
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3464/api/v2/swagger.json', headers={ 'Accept-Encoding': 'identity' })
+            assert await response.data == expected
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3464/api/v2/swagger.json', headers={ 'Accept-Encoding': 'gzip' }, decode_content=False)
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert gzip.decompress(await response.data) == expected
+        assert config.cache.document.oas.info.title == 'FakeApp'
+
+@fact
+def ignoresStaleSidecarFiles() -> None:
+    """Confirm that a pre-compressed sidecar older than the prebuilt document is not served."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'swagger.json')
+        with open(output + '.gz', 'wb') as file:
+            file.write(gzip.compress(b'{"stale":true}'))
+        current = json.dumps({ 'current': [True] * 256 }).encode()
+        with open(output, 'wb') as file:
+            file.write(current)
+        sidecarStat = os.stat(output + '.gz')
+        os.utime(output, ns=(sidecarStat.st_atime_ns, sidecarStat.st_mtime_ns + 1000000000))
+        content = openapi.CachedContent.load(output, 'application/json', { 'gzip': gzipEncoder })
+        assert gzip.decompress(content.encodings['gzip']) == current
+
+@fact
+def replacesExportedDocumentAtomically() -> None:
+    """Confirm that exporting over a document which is being served replaces the file, rather than rewriting it in place."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'swagger.json')
+        assert main(['export', 'tests.fakes.FakeApp:createApplication', '-o', output, '--compress', '--quiet']) == 0
+        served = openapi.CachedContent.load(output, 'application/json', { 'gzip': gzipEncoder })
+        expected = served.content[:]
+        inode = os.stat(output).st_ino
+        assert main(['export', 'tests.fakes.FakeApp:createApplication', '-o', output, '--compress', '--quiet']) == 0
+        assert os.stat(output).st_ino != inode
+        # the memory mapped (prior) document is still readable
+        assert served.content[:] == expected
+        assert sorted(os.listdir(directory)) == ['swagger.json', 'swagger.json.gz']
+        # sidecars are written after the document, so they are not mistaken for stale sidecars
+        assert os.stat(output + '.gz').st_mtime_ns >= os.stat(output).st_mtime_ns
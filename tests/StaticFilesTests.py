@@ -0,0 +1,403 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+import gzip
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+from punit import *
+import tornado
+import urllib3
+import zipfile
+import zlib
+from .fakes.FakeApi import FakeApi
+from .fakes.FakeTaggedApi import FakeTaggedApi
+import tornado_openapi as openapi
+
+_staticFilesPath = os.path.join(os.path.dirname(__file__), 'fakes', 'swagger-ui')
+
+@fact
+async def servesContentHashedDocumentUrls() -> None:
+    """Confirm that the initializer points at a content-addressed document url, which is served as immutable."""
+
+    app = tornado.web.Application()
+    app.listen(port=3465, address='127.0.0.1')
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Hashed', version='v2'))\
+        .staticFilesPath(_staticFilesPath)\
+        .contentHashedUrls()\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi)
+    ])
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3465/api/v2/swagger/swagger-initializer.js')
+        initializer = (await response.data).decode()
+        url = re.search(r'url:"([^"]+)"', initializer).group(1)
+        digest = config.cache.document.json.digest[:16]
+        assert url == f'swagger.{digest}.json'
+        response = await async_urllib3.request('GET', f'http://127.0.0.1:3465/api/v2/swagger.{digest}.json')
+        assert await response.data == config.cache.document.json.content
+        assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3465/api/v2/swagger.0123456789abcdef.json', redirect=False)
+        await response.data
+        assert response.status == 302
+        assert response.headers['Location'] == f'/api/v2/swagger.{digest}.json'
+
+@fact
+async def servesStaticFilesFromMemory() -> None:
+    """Confirm that static files are cached in memory, revalidated against the file on disk, and evicted when the cache is full."""
+
+    staticFilesPath = tempfile.mkdtemp()
+    try:
+        shutil.copytree(_staticFilesPath, staticFilesPath, dirs_exist_ok=True)
+        app = tornado.web.Application()
+        app.listen(port=3466, address='127.0.0.1')
+        config = openapi.OpenApiConfigurator(app)\
+            .pattern(r'/api/v2/(swagger.*)')\
+            .info(openapi.objects.Info(title='Static', version='v2'))\
+            .staticFilesPath(staticFilesPath)\
+            .commit()
+
+        async with urllib3.AsyncPoolManager() as async_urllib3:
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3466/api/v2/swagger/index.html')
+            first = await response.data
+            assert response.headers['Content-Type'] == 'text/html'
+            assert 'index.html' in config.staticFilesCache
+            content = config.staticFilesCache.resolve('index.html')
+            assert config.staticFilesCache.resolve('index.html') is content
+            # changes on disk are picked up
+            with open(os.path.join(staticFilesPath, 'index.html'), 'ab') as file:
+                file.write(b'<!-- changed -->')
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3466/api/v2/swagger/index.html')
+            second = await response.data
+            assert second == first + b'<!-- changed -->'
+            # ...unless revalidation is disabled
+            config.staticFilesRevalidate = False
+            content = config.staticFilesCache.resolve('index.html')
+            os.remove(os.path.join(staticFilesPath, 'index.html'))
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3466/api/v2/swagger/index.html')
+            assert await response.data == second
+            assert config.staticFilesCache.resolve('index.html') is content
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3466/api/v2/swagger/missing.js')
+            await response.data
+            assert response.status == 404
+
+        # least recently used files are evicted
+        config.staticFilesCacheSize = os.path.getsize(os.path.join(staticFilesPath, 'swagger-initializer.js'))
+        config.staticFilesCache.resolve('swagger-initializer.js')
+        assert 'index.html' not in config.staticFilesCache
+        assert config.staticFilesCache.size <= config.staticFilesCacheSize
+    finally:
+        shutil.rmtree(staticFilesPath)
+
+@fact
+async def servesPrecompressedStaticFiles() -> None:
+    """Confirm that static files are served gzip-encoded, preferring a `.gz` sibling file over compressing on load."""
+
+    staticFilesPath = tempfile.mkdtemp()
+    try:
+        shutil.copytree(_staticFilesPath, staticFilesPath, dirs_exist_ok=True)
+        bundle = b'/* swagger-ui-bundle */\n' + b'window.SwaggerUIBundle = function() {};\n' * 256
+        with open(os.path.join(staticFilesPath, 'swagger-ui-bundle.js'), 'wb') as file:
+            file.write(bundle)
+        sibling = gzip.compress(bundle, compresslevel=9)
+        with open(os.path.join(staticFilesPath, 'swagger-ui-bundle.js.gz'), 'wb') as file:
+            file.write(sibling)
+        app = tornado.web.Application()
+        app.listen(port=3467, address='127.0.0.1')
+        config = openapi.OpenApiConfigurator(app)\
+            .pattern(r'/api/v2/(swagger.*)')\
+            .info(openapi.objects.Info(title='Precompressed', version='v2'))\
+            .staticFilesPath(staticFilesPath)\
+            .commit()
+        config.staticFilesCache.preload()
+        assert 'swagger-ui-bundle.js' in config.staticFilesCache
+        assert 'swagger-ui-bundle.js.gz' not in config.staticFilesCache
+
+        async with urllib3.AsyncPoolManager() as async_urllib3:
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3467/api/v2/swagger/swagger-ui-bundle.js', headers={ 'Accept-Encoding': 'gzip' }, decode_content=False)
+            data = await response.data
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert response.headers['Vary'] == 'Accept-Encoding'
+            assert data == sibling
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3467/api/v2/swagger/index.html', headers={ 'Accept-Encoding': 'gzip' }, decode_content=False)
+            data = await response.data
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert data == config.staticFilesCache.resolve('index.html').encodings['gzip']
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3467/api/v2/swagger/swagger-ui-bundle.js', headers={ 'Accept-Encoding': 'identity' })
+            data = await response.data
+            assert 'Content-Encoding' not in response.headers
+            assert data == bundle
+    finally:
+        shutil.rmtree(staticFilesPath)
+
+@fact
+async def revalidatesStaticFiles() -> None:
+    """Confirm that static files carry validators and a configurable max-age, and conditional requests receive a 304."""
+
+    app = tornado.web.Application()
+    app.listen(port=3468, address='127.0.0.1')
+    openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Validators', version='v2'))\
+        .staticFilesPath(_staticFilesPath)\
+        .staticFilesMaxAge(3600)\
+        .commit()
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3468/api/v2/swagger/index.html', headers={ 'Accept-Encoding': 'identity' })
+        await response.data
+        assert response.status == 200
+        assert response.headers['Cache-Control'] == 'public, max-age=3600'
+        etag = response.headers['Etag']
+        lastModified = response.headers['Last-Modified']
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3468/api/v2/swagger/index.html', headers={ 'Accept-Encoding': 'identity', 'If-None-Match': etag })
+        assert len(await response.data) == 0
+        assert response.status == 304
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3468/api/v2/swagger/index.html', headers={ 'Accept-Encoding': 'identity', 'If-Modified-Since': lastModified })
+        assert len(await response.data) == 0
+        assert response.status == 304
+        # `If-None-Match` takes precedence over `If-Modified-Since`
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3468/api/v2/swagger/index.html', headers={ 'Accept-Encoding': 'identity', 'If-None-Match': '"other"', 'If-Modified-Since': lastModified })
+        assert len(await response.data) > 0
+        assert response.status == 200
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3468/api/v2/swagger/index.html', headers={ 'Accept-Encoding': 'identity', 'If-Modified-Since': 'Thu, 01 Jan 1970 00:00:00 GMT' })
+        assert len(await response.data) > 0
+        assert response.status == 200
+
+@fact
+async def cachesRewrittenInitializer() -> None:
+    """Confirm that the `swagger-ui` initializer is rewritten once per spec url, and is served like any other static file."""
+
+    app = tornado.web.Application()
+    app.listen(port=3469, address='127.0.0.1')
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Initializer', version='v2'))\
+        .staticFilesPath(_staticFilesPath)\
+        .commit()
+    rewrites = list[bytes]()
+    def rewrite(buf:bytes) -> bytes:
+        rewrites.append(buf)
+        return buf.replace(b'petstore', b'example')
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3469/api/v2/swagger/swagger-initializer.js', headers={ 'Accept-Encoding': 'gzip' }, decode_content=False)
+        data = gzip.decompress(await response.data)
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert b'url:"swagger.json",' in data
+        etag = response.headers['Etag']
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3469/api/v2/swagger/swagger-initializer.js', headers={ 'Accept-Encoding': 'gzip', 'If-None-Match': etag })
+        await response.data
+        assert response.status == 304
+
+    content = config.staticFilesCache.resolveRewritten('swagger-initializer.js', 'example', rewrite)
+    assert config.staticFilesCache.resolveRewritten('swagger-initializer.js', 'example', rewrite) is content
+    assert len(rewrites) == 1
+    assert b'example' in content.content
+    assert config.staticFilesCache.resolveRewritten('swagger-initializer.js', 'other', rewrite) is not content
+    assert len(rewrites) == 2
+
+@fact
+async def servesStaticFilesFromZipFile() -> None:
+    """Confirm that static files are served out of a zip file, and that deflated members are served as gzip without recompressing them."""
+
+    archiveDirectory = tempfile.mkdtemp()
+    try:
+        archivePath = os.path.join(archiveDirectory, 'app.pyz')
+        with zipfile.ZipFile(archivePath, 'w') as archive:
+            archive.writestr('zippedapp/__init__.py', '')
+            archive.write(os.path.join(_staticFilesPath, 'index.html'), 'zippedapp/swagger-ui/index.html', zipfile.ZIP_DEFLATED)
+            archive.write(os.path.join(_staticFilesPath, 'swagger-initializer.js'), 'zippedapp/swagger-ui/swagger-initializer.js', zipfile.ZIP_STORED)
+        sys.path.insert(0, archivePath)
+        try:
+            app = tornado.web.Application()
+            app.listen(port=3470, address='127.0.0.1')
+            config = openapi.OpenApiConfigurator(app)\
+                .pattern(r'/api/v2/(swagger.*)')\
+                .info(openapi.objects.Info(title='Zipped', version='v2'))\
+                .staticFilesResources('zippedapp', 'swagger-ui')\
+                .commit()
+        finally:
+            sys.path.remove(archivePath)
+            sys.modules.pop('zippedapp', None)
+        assert config.staticFilesPath == os.path.join(archivePath, 'zippedapp', 'swagger-ui')
+        assert config.staticFilesCache.preload() == 2
+
+        async with urllib3.AsyncPoolManager() as async_urllib3:
+            with zipfile.ZipFile(archivePath) as archive:
+                index = archive.read('zippedapp/swagger-ui/index.html')
+                initializer = archive.read('zippedapp/swagger-ui/swagger-initializer.js')
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3470/api/v2/swagger/index.html', headers={ 'Accept-Encoding': 'gzip' }, decode_content=False)
+            data = await response.data
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert response.headers['Last-Modified'] is not None
+            assert gzip.decompress(data) == index
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3470/api/v2/swagger/index.html', headers={ 'Accept-Encoding': 'identity' })
+            assert await response.data == index
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3470/api/v2/swagger/swagger-initializer.js')
+            data = await response.data
+            assert b'url:"swagger.json",' in data
+            assert len(data) < len(initializer)
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3470/api/v2/swagger/__init__.py')
+            await response.data
+            assert response.status == 404
+        config.staticFilesPath = _staticFilesPath
+        config.staticFilesCache.clear()
+        assert config.staticFilesCache.resolve('index.html') is not None
+    finally:
+        shutil.rmtree(archiveDirectory)
+
+@fact
+async def streamsLargeStaticFiles() -> None:
+    """Confirm that static files too large to cache are streamed from disk, and that byte ranges are supported."""
+
+    staticFilesPath = tempfile.mkdtemp()
+    try:
+        bundle = bytes(range(256)) * 1024
+        with open(os.path.join(staticFilesPath, 'swagger-ui-bundle.js'), 'wb') as file:
+            file.write(bundle)
+        shutil.copy(os.path.join(_staticFilesPath, 'index.html'), staticFilesPath)
+        app = tornado.web.Application()
+        app.listen(port=3471, address='127.0.0.1')
+        config = openapi.OpenApiConfigurator(app)\
+            .pattern(r'/api/v2/(swagger.*)')\
+            .info(openapi.objects.Info(title='Streaming', version='v2'))\
+            .staticFilesPath(staticFilesPath)\
+            .staticFilesCacheSize(65536)\
+            .chunkSize(16384)\
+            .executor()\
+            .commit()
+
+        async with urllib3.AsyncPoolManager() as async_urllib3:
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3471/api/v2/swagger/swagger-ui-bundle.js', headers={ 'Accept-Encoding': 'gzip' })
+            data = await response.data
+            assert response.status == 200
+            assert data == bundle
+            assert 'Content-Encoding' not in response.headers
+            assert response.headers['Accept-Ranges'] == 'bytes'
+            assert 'swagger-ui-bundle.js' not in config.staticFilesCache
+            etag = response.headers['Etag']
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3471/api/v2/swagger/swagger-ui-bundle.js', headers={ 'If-None-Match': etag })
+            await response.data
+            assert response.status == 304
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3471/api/v2/swagger/swagger-ui-bundle.js', headers={ 'Range': 'bytes=100000-100099' })
+            assert await response.data == bundle[100000:100100]
+            assert response.status == 206
+            assert response.headers['Content-Range'] == f'bytes 100000-100099/{len(bundle)}'
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3471/api/v2/swagger/swagger-ui-bundle.js', headers={ 'Range': 'bytes=-10', 'If-Range': etag })
+            assert await response.data == bundle[-10:]
+            assert response.status == 206
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3471/api/v2/swagger/swagger-ui-bundle.js', headers={ 'Range': 'bytes=0-9', 'If-Range': '"outdated"' })
+            assert await response.data == bundle
+            assert response.status == 200
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3471/api/v2/swagger/swagger-ui-bundle.js', headers={ 'Range': f'bytes={len(bundle)}-' })
+            await response.data
+            assert response.status == 416
+            assert response.headers['Content-Range'] == f'bytes */{len(bundle)}'
+            # cached files support ranges too, served from the unencoded content
+            response = await async_urllib3.request('GET', 'http://127.0.0.1:3471/api/v2/swagger/index.html', headers={ 'Accept-Encoding': 'gzip', 'Range': 'bytes=0-14' })
+            assert await response.data == b'<!-- HTML for s'
+            assert response.status == 206
+            assert 'Content-Encoding' not in response.headers
+    finally:
+        shutil.rmtree(staticFilesPath)
+
+@fact
+async def inlinesSpecIntoInitializer() -> None:
+    """Confirm that the OAS document can be embedded in the `swagger-ui` initializer, and that it tracks changes to the document."""
+
+    app = tornado.web.Application()
+    app.listen(port=3472, address='127.0.0.1')
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Inline', version='v2'))\
+        .staticFilesPath(_staticFilesPath)\
+        .inlineSpec()\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi)
+    ])
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3472/api/v2/swagger/swagger-initializer.js')
+        initializer = await response.data
+        assert response.headers['Cache-Control'] == 'no-cache'
+        assert b'url:' not in initializer
+        assert b'spec:' + config.cache.document.json.content + b',' in initializer
+        app.add_handlers('.*', [
+            (r'/api/v2/fakes/(?P<id>\d+)', FakeApi)
+        ])
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3472/api/v2/swagger/swagger-initializer.js')
+        updated = await response.data
+        assert updated != initializer
+        assert b'spec:' + config.cache.document.json.content + b',' in updated
+        etag = response.headers['Etag']
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3472/api/v2/swagger/swagger-initializer.js', headers={ 'If-None-Match': etag })
+        await response.data
+        assert response.status == 304
+        # the initializer is compressed as a whole, as a single gzip member
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3472/api/v2/swagger/swagger-initializer.js', headers={ 'Accept-Encoding': 'gzip' }, decode_content=False)
+        compressed = await response.data
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Etag'] != etag
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        assert decoder.decompress(compressed) + decoder.flush() == updated
+        assert decoder.eof and len(decoder.unused_data) == 0
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3472/api/v2/swagger/swagger-initializer.js', headers={ 'Accept-Encoding': 'gzip' }, decode_content=False)
+        assert await response.data == compressed
+
+@fact
+async def servesPerTagSubDocuments() -> None:
+    """Confirm that a sub-document is served for each tag, including only the schemas it requires, and that the initializer lists them."""
+
+    app = tornado.web.Application()
+    app.listen(port=3473, address='127.0.0.1')
+    config = openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='Shards', version='v2'))\
+        .staticFilesPath(_staticFilesPath)\
+        .shardByTag()\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi),
+        (r'/api/v2/tagged', FakeTaggedApi)
+    ])
+
+    async with urllib3.AsyncPoolManager() as async_urllib3:
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3473/api/v2/swagger/swagger-initializer.js')
+        initializer = await response.data
+        assert b'urls:[{url:"/api/v2/swagger/tags/FakeApi.json",name:"FakeApi"},{url:"/api/v2/swagger/tags/Tagged.json",name:"Tagged"}],' in initializer
+        # as requested by swagger-ui when opened without a trailing slash (such as `/api/v2/swagger`)
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3473/api/v2/swagger-initializer.js')
+        assert await response.data == initializer
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3473/api/v2/swagger/tags/FakeApi.json')
+        await response.data
+        assert response.status == 200
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3473/api/v2/swagger/tags/Tagged.json')
+        tagged = json.loads(await response.data)
+        assert response.status == 200
+        assert list(tagged['paths'].keys()) == ['/api/v2/tagged']
+        assert sorted(tagged['components']['schemas'].keys()) == ['tests.fakes.FakeApi.FakeObj', 'tests.fakes.FakeTaggedApi.FakeTaggedObj']
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3473/api/v2/swagger/tags/FakeApi.yaml')
+        await response.data
+        assert response.status == 200
+        assert response.headers['Content-Type'] == 'application/yaml'
+        response = await async_urllib3.request('GET', 'http://127.0.0.1:3473/api/v2/swagger/tags/Missing.json')
+        await response.data
+        assert response.status == 404
+
+    document = config.cache.document
+    assert document.tags == ['FakeApi', 'Tagged']
+    assert document.select(['Tagged']) is document.select(['Tagged'])
+    fakeApi = document.select(['FakeApi']).oas.asDictionary()
+    assert '/api/v2/tagged' not in fakeApi['paths']
+    assert 'tests.fakes.FakeTaggedApi.FakeTaggedObj' not in fakeApi['components']['schemas']
+    # the source document is unaffected
+    assert len(document.oas.asDictionary()['components']['schemas']) == 3
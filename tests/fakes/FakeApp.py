@@ -0,0 +1,24 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+import tornado
+import tornado_openapi as openapi
+
+from .FakeApi import FakeApi
+
+
+def createApplication() -> tornado.web.Application:
+    """An application factory, as would be passed to ``python -m tornado_openapi export``."""
+    app = tornado.web.Application()
+    openapi.OpenApiConfigurator(app)\
+        .pattern(r'/api/v2/(swagger.*)')\
+        .info(openapi.objects.Info(title='FakeApp', version='v2'))\
+        .filter(lambda e: e in ['FakeApi'])\
+        .commit()
+    app.add_handlers('.*', [
+        (r'/api/v2/fakes', FakeApi),
+        (r'/api/v2/fakes/(?P<id>\d+)', FakeApi),
+        (r'/api/v2/fakes/(?P<name>[\dA-Za-z]+)', FakeApi),
+        (r'/api/v2/fakes/(?P<id>\d+)?name=(?P<name>[^/][\dA-Za-z]+)', FakeApi)
+    ])
+    return app
@@ -0,0 +1,26 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+#
+# A second "fake api", with a distinct tag, used to test per-tag
+# sub-documents. Its schemas intentionally reference schemas used by
+# `FakeApi` so that sub-documents must resolve references transitively.
+##
+
+import tornado
+import tornado_openapi as openapi
+
+from .FakeApi import FakeObj
+
+
+class FakeTaggedObj:
+    """An object referencing another object."""
+    name:str
+    child:FakeObj
+
+
+@openapi.api('Tagged')
+class FakeTaggedApi(tornado.web.RequestHandler):
+
+    @openapi.response('200', FakeTaggedObj, description='Success')
+    async def get(self) -> None:
+        self.write({})
@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+from collections.abc import Buffer
+import datetime
+import hashlib
+import mmap
+import os
+import stat
+from typing import Callable
+
+_encodingExtensions = {
+    'br': '.br',
+    'deflate': '.zz',
+    'gzip': '.gz',
+    'zstd': '.zst'
+}
+
+
+type CachedContent = CachedContent
+class CachedContent:
+    """
+    An immutable, ready-to-serve response body along with its validators and pre-encoded variants.
+
+    The ETag and any encoded variants are computed once, when the content is cached, rather than once per request.
+    """
+
+    __content:Buffer
+    __contentType:str
+    __digest:str
+    __encodings:dict[str,Buffer]
+    __etag:str
+    __lastModified:datetime.datetime|None
+
+    def __init__(self, content:Buffer, contentType:str, encoders:dict[str,Callable[[bytes],bytes]] = None, encoded:dict[str,Buffer] = None, lastModified:datetime.datetime = None) -> None:
+        """
+        :param Buffer content: The response body, typically ``bytes`` but may be any sliceable buffer such as an ``mmap``.
+        :param str contentType: The value for the ``Content-Type`` header.
+        :param dict encoders: Encoders to apply to the content, keyed by ``Content-Encoding`` name.
+        :param dict encoded: Variants which have already been encoded, keyed by ``Content-Encoding`` name. These take precedence over ``encoders``.
+        :param datetime lastModified: When the content was last modified, if known, such as the modification time of the file it was read from.
+        """
+        self.__content = content
+        self.__contentType = contentType
+        self.__lastModified = lastModified
+        self.__digest = hashlib.sha256(content).hexdigest()
+        self.__etag = f'"{self.__digest}"'
+        self.__encodings = dict[str,Buffer]() if encoded is None else dict[str,Buffer](encoded)
+        if encoders is not None:
+            for name,encoder in encoders.items():
+                if name in self.__encodings:
+                    continue
+                encodedContent = encoder(content)
+                # an encoding that does not reduce size is not worth serving
+                if len(encodedContent) < len(content):
+                    self.__encodings[name] = encodedContent
+
+    @staticmethod
+    def load(path:str, contentType:str, encoders:dict[str,Callable[[bytes],bytes]] = None) -> CachedContent:
+        """
+        Loads content from a file using a read-only memory map, so that the page cache is shared by every process serving the same file rather than each holding a private copy.
+
+        Pre-encoded sidecar files (such as ``swagger.json.gz``) are memory mapped the same way. Only encodings named in ``encoders`` are considered, an encoding without a (current) sidecar file is encoded on load.
+
+        NOTE: files must be replaced atomically (written elsewhere, then renamed over the original) and never rewritten in place, reading a memory mapped file which has been truncated raises ``SIGBUS``.
+        """
+        def mapFile(filePath:str) -> Buffer:
+            with open(filePath, 'rb') as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    # NOTE: empty files cannot be memory mapped
+                    return b''
+                # NOTE: the mapping remains valid after the file is closed
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        encoded = dict[str,Buffer]()
+        if encoders is not None:
+            fileStat = os.stat(path)
+            for name in encoders.keys():
+                sidecarPath = path + CachedContent.extensionFor(name)
+                try:
+                    sidecarStat = os.stat(sidecarPath)
+                except OSError:
+                    continue
+                # a sidecar older than the file it was encoded from is presumed stale
+                if stat.S_ISREG(sidecarStat.st_mode) and sidecarStat.st_mtime_ns >= fileStat.st_mtime_ns:
+                    encoded[name] = mapFile(sidecarPath)
+        return CachedContent(mapFile(path), contentType, encoders, encoded)
+
+    @property
+    def content(self) -> Buffer:
+        """The response body, unencoded. Slicing the body always produces ``bytes``."""
+        return self.__content
+
+    @property
+    def contentType(self) -> str:
+        """The value for the ``Content-Type`` header."""
+        return self.__contentType
+
+    @property
+    def digest(self) -> str:
+        """A hex-encoded SHA-256 hash of the content."""
+        return self.__digest
+
+    @property
+    def encodings(self) -> dict[str,Buffer]:
+        """The pre-encoded variants of the content, keyed by ``Content-Encoding`` name (such as ``'gzip'``.)"""
+        return self.__encodings
+
+    @property
+    def etag(self) -> str:
+        """A strong ETag (including quotes) derived from a hash of the content."""
+        return self.__etag
+
+    @property
+    def lastModified(self) -> datetime.datetime|None:
+        """When the content was last modified, if known, used for the ``Last-Modified`` header."""
+        return self.__lastModified
+
+    @staticmethod
+    def extensionFor(encoding:str) -> str:
+        """Returns the conventional file extension for files holding content in the given encoding, such as ``'.gz'`` for ``'gzip'``."""
+        return _encodingExtensions.get(encoding, f'.{encoding}')
+
+    def etagFor(self, encoding:str|None) -> str:
+        """Returns the strong ETag for the given encoding. Each encoded variant is a distinct representation, and so has a distinct ETag."""
+        return self.__etag if encoding is None else f'{self.__etag[:-1]}-{encoding}"'
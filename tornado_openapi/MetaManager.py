@@ -13,6 +13,7 @@ from .objects.Responses import Responses
 from .objects.RequestBody import RequestBody
 from .objects.Schema import Schema
 from .objects.SecurityRequirement import SecurityRequirement
+from .OperationMetadata import OperationMetadata
 
 _wellKnownTypeSchemas:dict[str,Schema] = {
     'Any': Schema().merge(dict(
@@ -58,6 +59,9 @@ _wellKnownTypeSchemas:dict[str,Schema] = {
 }
 
 
+_requestMethods = ('delete', 'get', 'head', 'options', 'patch', 'post', 'put', 'trace')
+
+
 type MetaManager = MetaManager
 class MetaManager:
 
@@ -65,20 +69,28 @@ class MetaManager:
     __cookies:dict[Any,dict[str,Parameter]]
     __headers:dict[Any,dict[str,Parameter]]
     __instance:MetaManager = None
+    __operations:dict[type,tuple[int,dict[str,OperationMetadata]]]
     __responses:dict[Any,Responses]
     __requests:dict[Any,RequestBody]
+    __resetVersion:int
     __schemas:dict[str,Schema]
     __tags:dict[Any,str]
+    __targetVersions:dict[Any,int]
+    __version:int
 
     def __init__(self):
         self.__security = dict[Any,list[SecurityRequirement]]()
         self.__cookies = dict[Any,dict[str,Parameter]]()
         self.__headers = dict[Any,dict[str,Parameter]]()
+        self.__operations = dict[type,tuple[int,dict[str,OperationMetadata]]]()
         self.__responses = dict[Any,Responses]()
         self.__requests = dict[Any,RequestBody]()
+        self.__resetVersion = 0
         self.__schemas = dict[str,Schema]()
         self.__schemas.update(_wellKnownTypeSchemas)
         self.__tags = dict[Any,str]()
+        self.__targetVersions = dict[Any,int]()
+        self.__version = 0
 
     @property
     def security(self) -> dict[Any,list[SecurityRequirement]]:
@@ -108,12 +120,88 @@ class MetaManager:
     def tags(self) -> dict[Any,list[str]]:
         return self.__tags
 
+    @property
+    def version(self) -> int:
+        """A counter which is incremented every time metadata changes, used to detect stale OAS documents."""
+        return self.__version
+
     @classmethod
     def instance(cls) -> MetaManager:
         if cls.__instance is None:
             cls.__instance = MetaManager()
         return cls.__instance
 
+    def invalidate(self, target:Any = None) -> None:
+        """
+        Signals that metadata has changed, causing any cached OAS documents to be rebuilt on next access.
+
+        Decorators call this for you. You only need to call it if you modify metadata directly.
+
+        :param Any target: The class, function or type whose metadata changed, so that only the routes it affects are interrogated again (see :py:meth:`changedSince`.) If ``None`` (the default) all metadata is treated as changed.
+        """
+        self.__version += 1
+        if target is None:
+            self.__resetVersion = self.__version
+        else:
+            self.__targetVersions[target] = self.__version
+
+    def changedSince(self, version:int) -> list[Any]|None:
+        """
+        Returns the targets (classes, functions and types) whose metadata has changed since :py:attr:`version` was ``version``, or ``None`` if all metadata has been invalidated since then.
+        """
+        if version < self.__resetVersion:
+            return None
+        return [target for target,targetVersion in self.__targetVersions.items() if targetVersion > version]
+
+    def __isCurrent(self, handler:type, entry:tuple[int,dict[str,OperationMetadata]]) -> bool:
+        version, operations = entry
+        if version < self.__resetVersion or self.__targetVersions.get(handler, 0) > version:
+            return False
+        return all(self.__targetVersions.get(e.action, 0) <= version for e in operations.values())
+
+    def operationsFor(self, handler:type) -> dict[str,OperationMetadata]:
+        """
+        Returns the metadata of every request method defined by a ``RequestHandler`` class, keyed by (lower case) method name.
+
+        Metadata is resolved once per class, and again only when metadata of the class or one of its request methods changes. The result must not be modified.
+        """
+        entry = self.__operations.get(handler, None)
+        if entry is not None and self.__isCurrent(handler, entry):
+            return entry[1]
+        result = dict[str,OperationMetadata]()
+        for method in _requestMethods:
+            action = handler.__dict__.get(method, None)
+            while hasattr(action, '__wrapped__'):
+                action = getattr(action, '__wrapped__')
+            if action is None:
+                continue
+            security = self.__security.get(action, None)
+            result[method] = OperationMetadata(
+                handler,
+                method,
+                action,
+                self.__tags.get(handler, []) + self.__tags.get(action, []),
+                self.__headers.get(action, None),
+                self.__cookies.get(action, None),
+                self.__requests.get(action, None),
+                self.__responses.get(action, None),
+                security if security is not None else self.__security.get(handler, None))
+        self.__operations[handler] = (self.__version, result)
+        return result
+
+    def operationFor(self, handler:type, method:str) -> OperationMetadata|None:
+        """
+        Returns the metadata of one request method of a ``RequestHandler`` class, or ``None`` if the class does not define it. For example, from within a request:
+
+        .. code:: python
+
+            operation = MetaManager.instance().operationFor(type(self), self.request.method.lower())
+
+        :param type handler: The ``RequestHandler`` class.
+        :param str method: The (lower case) name of the request method, such as ``'get'``.
+        """
+        return self.operationsFor(handler).get(method, None)
+
     def __getSchemaRefForType(self, t:type) -> str:
         wellKnown = _wellKnownTypeSchemas.get(t.__name__, None)
         if wellKnown is not None:
@@ -190,6 +278,7 @@ class MetaManager:
                     schema = Schema()
                     # NOTE: stored up front to prevent cycles for self-referencing type definitions
                     MetaManager.instance().schemas[schemaRef] = schema
+                    MetaManager.instance().invalidate(t)
                     schema['type'] = 'object'
                     schema['properties'] = dict[str, dict[str,str]]()
                     typeAttributes = [(k,v) for k,v in inspect.get_annotations(t).items() if not k.startswith('_')]
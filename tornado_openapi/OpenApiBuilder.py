@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+from typing import ForwardRef
+import tornado
+import tornado.web
+
+from .MetaManager import MetaManager
+from .objects import Components, OpenAPI, Operation, Paths, PathItem
+from .OpenApiRouteIndex import OpenApiRouteIndex
+
+OpenApiConfiguration = ForwardRef('OpenApiConfiguration')
+
+
+class OpenApiBuilder:
+    """
+    Builds an OAS document for a ``tornado.web.Application`` from the operations found in its routing rules, applying the ``filter`` of an :py:class:`~tornado_openapi.OpenApiConfiguration`.
+    """
+
+    __configuration:OpenApiConfiguration
+    __generation:int
+    __index:OpenApiRouteIndex
+    __mergedOperationCount:int
+    __paths:Paths
+    __requiredSchemas:set[str]
+
+    def __init__(self, application:tornado.web.Application, configuration:OpenApiConfiguration) -> None:
+        self.__configuration = configuration
+        self.__generation = -1
+        self.__index = OpenApiRouteIndex.forApplication(application)
+        self.__mergedOperationCount = 0
+        self.__paths = Paths()
+        self.__requiredSchemas = set[str]()
+
+    def __mergeOperations(self) -> Paths:
+        generation, operations = self.__index.scan()
+        if generation != self.__generation:
+            # the index was rebuilt, previously merged operations are outdated
+            self.__generation = generation
+            self.__mergedOperationCount = 0
+            self.__paths = Paths()
+            self.__requiredSchemas = set[str]()
+        for path, actionName, sharedOperation, tags, requiredSchemas in operations[self.__mergedOperationCount:]:
+            tags = [t for t in tags if self.__configuration.filter(t)]
+            if len(tags) > 0:
+                self.__requiredSchemas.update(requiredSchemas)
+                # NOTE: a shallow copy, the operation is shared with other configurations
+                operation = Operation(sharedOperation.asDictionary())
+                operation.tags = tags
+                pathItem = self.__paths[path]
+                if pathItem is None:
+                    pathItem = PathItem()
+                pathItem[actionName] = operation
+                self.__paths[path] = pathItem
+        self.__mergedOperationCount = len(operations)
+        return self.__paths
+
+    def build(self) -> OpenAPI:
+        """
+        Interrogates the application routes and decorator metadata, producing an OAS document.
+
+        Routes are walked (and handlers interrogated) by the :py:class:`OpenApiRouteIndex` of the application, which is shared with other configurations. A builder remembers which operations it has already merged, calling ``build()`` again only merges operations added since the prior build into the prior paths.
+        """
+        oas:OpenAPI = OpenAPI()
+        oas.info = self.__configuration.info
+ 
+        # TODO: oas.servers = servers
+
+        # build paths
+        # NOTE: a shallow copy, so that documents from prior builds are not modified by later builds
+        oas.paths = Paths(self.__mergeOperations().asDictionary())
+        # build schema dictionary
+        components = Components(
+            schemas={
+                k.replace('#/components/schemas/',''):v
+                for k,v in MetaManager.instance().schemas.items()
+                # only include non-builtin types (by requiring schema name to start with #)
+                if k.startswith('#') and k in self.__requiredSchemas
+            },
+            securitySchemes=None if self.__configuration.securitySchemes is None or len(self.__configuration.securitySchemes) == 0 else {
+                k:v
+                for k,v in self.__configuration.securitySchemes.items()
+            }
+        )
+        oas.components = components
+        # result
+        return oas
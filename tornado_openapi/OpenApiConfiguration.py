@@ -1,25 +1,155 @@
 # SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
 # SPDX-License-Identifier: MIT
 
-from typing import Callable
+from concurrent.futures import Executor
+import gc
+import gzip
+import json
+from typing import Any, Callable
+import tornado
+import tornado.log
+import tornado.web
 
 from .objects.Info import Info
 from .objects.SecurityScheme import SecurityScheme
+from .OpenApiDocument import OpenApiDocument
+from .OpenApiDocumentCache import OpenApiDocumentCache
+from .StaticFilesCache import StaticFilesCache
+from .yamlEncoder import yamlEncoder
+
+
+def compactJsonEncoder(value:Any) -> bytes:
+    """The default JSON encoder. Emits UTF-8 encoded JSON without insignificant whitespace."""
+    return json.dumps(value, separators=(',',':'), ensure_ascii=False).encode('utf-8')
+
+
+def gzipEncoder(content:bytes) -> bytes:
+    """The default ``gzip`` encoder. The timestamp is fixed so that identical content always produces identical output."""
+    return gzip.compress(content, mtime=0)
 
 
 class OpenApiConfiguration:
     """
     The configuration to be used when generating an OAS document.
     """
+    cacheControl:str|None
+    """The ``Cache-Control`` header sent with OAS documents, or ``None`` to omit the header. Default is ``'no-cache'``, which allows caching but requires clients to revalidate using the ``ETag``."""
+    cache:OpenApiDocumentCache
+    """The cache holding the OAS document built for this configuration. Managed by :py:class:`~tornado_openapi.OpenApiHandler`, you should not need to replace it."""
+    chunkSize:int|None
+    """The maximum number of bytes written to the network before awaiting a flush when serving OAS documents and static files, which bounds per-request memory for very large responses. ``None`` writes cached content in a single call. Default is ``65536``."""
+    contentHashedUrls:bool
+    """If ``True``, OAS documents are also served at content-addressed urls (such as ``swagger.0123456789abcdef.json``) with ``Cache-Control: public, max-age=31536000, immutable``, and the ``swagger-ui`` initializer is rewritten to use them. Default is ``False``."""
     disableSchemaNamespaces:bool
     """An override option to disable schema namespacing. Can result in collisions, should be used with caution. Default is ``False``."""
+    encoders:dict[str,Callable[[bytes],bytes]]
+    """Encoders used to pre-compress OAS documents, keyed by ``Content-Encoding`` name. Each encoder is invoked once per build, and clients receive whichever variant their ``Accept-Encoding`` header prefers. Default is ``{ 'gzip': gzipEncoder }``."""
+    executor:Executor|None
+    """An executor used to build OAS documents and sub-documents (and read static files too large to cache) off of the IOLoop, or ``None`` to do so on the IOLoop. Default is ``None``."""
     filter:Callable[[str], bool]
     """A callback/predicate function to filter ``tag`` content. Useful for separating OAS by API Version, or similar, where you want to have two OAS endpoints, two configurations, and then need to filter which tags/APIs appear in each OAS. Default is ``lambda e: True``."""
     info:Info
     """The Info Object to be used when describing the API. Default is ``None``."""
+    inlineSpec:bool
+    """If ``True``, the ``swagger-ui`` initializer is rewritten to embed the OAS document (as ``spec:``) rather than fetch it (from ``url:``), so that loading ``swagger-ui`` costs one less round trip. Default is ``False``."""
+    jsonEncoder:Callable[[Any],bytes]
+    """The function used to serialize OAS documents to JSON. It receives a ``dict`` and must return UTF-8 encoded ``bytes``, for example ``orjson.dumps``. Default is ``compactJsonEncoder``."""
     pattern:str
     """The path match pattern to be used with Tornado for serving OAS documents and (when installed) ``swagger-ui``. Default is ``r'/(swagger.*)'``."""
+    prebuiltPath:str|None
+    """The path of a prebuilt OAS document (JSON), such as one written by ``python -m tornado_openapi export``. When set, routes are never interrogated, the file (and any pre-compressed sidecar files) are served from a read-only memory map. Default is ``None``."""
     securitySchemes:dict[str,SecurityScheme]
     """The Security Schema Objects defined for the the API. Default is ``None``."""
+    shardByTag:bool
+    """If ``True``, a sub-document is served for each tag (such as ``swagger/tags/{tag}.json``) containing only the operations with that tag and the component schemas they require, and the ``swagger-ui`` initializer is rewritten to list them (as ``urls:``) so that ``swagger-ui`` only fetches and parses the selected tag. Takes precedence over :py:attr:`inlineSpec`. Default is ``False``."""
+    staticFilesCache:StaticFilesCache
+    """The cache holding ``swagger-ui`` static files for this configuration. Managed by :py:class:`~tornado_openapi.OpenApiHandler`, you should not need to replace it."""
+    staticFilesCacheSize:int|None
+    """The maximum number of bytes of ``swagger-ui`` static files held in memory, least recently used files are evicted first. Files larger than this are streamed from disk. ``None`` is unbounded. Default is ``16777216`` (16 MiB.)"""
+    staticFilesMaxAge:int|None
+    """The ``max-age`` (in seconds) sent in the ``Cache-Control`` header of ``swagger-ui`` static files. When ``0`` or ``None`` static files are sent with ``Cache-Control: no-cache``, so clients revalidate (cheaply) using ``ETag`` and ``Last-Modified`` on every use. Default is ``0``."""
     staticFilesPath:str
-    """The static files path where ``swagger-ui`` can be found. Default is ``./swagger-ui``."""
+    """The static files path where ``swagger-ui`` can be found, which may be a zip file or a directory within one. Default is ``./swagger-ui``."""
+    staticFilesRevalidate:bool
+    """If ``True``, cached ``swagger-ui`` static files are checked against the modification time and size of the file on disk on every request, and reloaded when changed. Set to ``False`` in production to serve cached files without touching the filesystem. Default is ``True``."""
+
+    yamlEncoder:Callable[[Any],bytes]
+    """The function used to serialize OAS documents to YAML. It receives a ``dict`` and must return UTF-8 encoded ``bytes``. Default is the built-in, dependency-free ``yamlEncoder``."""
+
+    def __init__(self) -> None:
+        self.cache = OpenApiDocumentCache(self)
+        self.cacheControl = 'no-cache'
+        self.chunkSize = 65536
+        self.contentHashedUrls = False
+        self.disableSchemaNamespaces = False
+        self.encoders = { 'gzip': gzipEncoder }
+        self.executor = None
+        self.filter = lambda e: True
+        self.info = None
+        self.inlineSpec = False
+        self.jsonEncoder = compactJsonEncoder
+        self.pattern = r'/(swagger.*)'
+        self.prebuiltPath = None
+        self.securitySchemes = None
+        self.shardByTag = False
+        self.staticFilesCache = StaticFilesCache(self)
+        self.staticFilesCacheSize = 16777216
+        self.staticFilesMaxAge = 0
+        self.staticFilesPath = './swagger-ui'
+        self.staticFilesRevalidate = True
+        self.yamlEncoder = yamlEncoder
+
+    def warm(self, application:tornado.web.Application) -> OpenApiDocument:
+        """
+        Builds and serializes the OAS document up front, so that the first request for it is served from memory.
+
+        Call this after all calls to ``add_handlers`` have been made, otherwise the document will be rebuilt on first request anyway.
+
+        :param tornado.web.Application application: The application the document describes.
+        :returns OpenApiDocument: The cached document, see :py:attr:`~tornado_openapi.OpenApiDocument.buildDuration` and :py:attr:`~tornado_openapi.OpenApiDocument.serializeDuration` for timings.
+        """
+        document = self.cache.resolve(application)
+        self.__logTimings(document)
+        return document
+
+    async def warmAsync(self, application:tornado.web.Application) -> OpenApiDocument:
+        """
+        As :py:meth:`warm`, but the document is built on :py:attr:`executor` (if one is configured) so that the IOLoop is not blocked by the build.
+
+        :param tornado.web.Application application: The application the document describes.
+        :returns OpenApiDocument: The cached document.
+        """
+        document = await self.cache.resolveAsync(application, self.executor)
+        self.__logTimings(document)
+        return document
+
+    def __logTimings(self, document:OpenApiDocument) -> None:
+        tornado.log.app_log.info(f'OAS document for {self.pattern!r} built in {document.buildDuration*1000:.1f}ms, serialized in {document.serializeDuration*1000:.1f}ms ({len(document.json.content)} bytes).')
+
+    def prebuild(self, application:tornado.web.Application, freezeGarbageCollector:bool = True) -> OpenApiDocument:
+        """
+        Builds and serializes everything needed to serve OAS documents, then freezes the cache. Intended to be called in a parent process before ``tornado.process.fork_processes``, so that every child inherits the cached documents through copy-on-write memory rather than building its own:
+
+        .. code:: python
+
+            app = createApplication()
+            config.prebuild(app)
+            tornado.process.fork_processes(0)
+
+        ``swagger-ui`` static files are preloaded into :py:attr:`staticFilesCache` as well.
+
+        Serialized documents are held as immutable ``bytes`` and, once frozen, requests no longer walk the routing rules of the application, so the pages holding them remain shared with the parent.
+
+        :param tornado.web.Application application: The application the document describes. All handlers should already be added.
+        :param bool freezeGarbageCollector: If ``True`` (the default) ``gc.freeze()`` is called, so that garbage collection in child processes does not touch (and copy) objects inherited from the parent.
+        :returns OpenApiDocument: The cached document.
+        """
+        document = self.warm(application)
+        # NOTE: accessing the YAML document serializes it
+        document.yaml
+        self.staticFilesCache.preload()
+        self.cache.freeze()
+        if freezeGarbageCollector:
+            gc.collect()
+            gc.freeze()
+        return document
@@ -1,15 +1,23 @@
 # SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
 # SPDX-License-Identifier: MIT
 
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+import importlib.resources
+import os
+import pathlib
 import tornado
-from typing import Callable
+import tornado.ioloop
+from typing import Any, Callable
+import zipfile
 
 from .objects.Info import Info
 from .objects.OAuthFlows import OAuthFlows
 from .objects.ParameterLocation import ParameterLocation
 from .objects.SecurityScheme import SecurityScheme, SecuritySchemeType
-from .OpenApiConfiguration import OpenApiConfiguration
+from .OpenApiConfiguration import OpenApiConfiguration, compactJsonEncoder, gzipEncoder
 from .OpenApiHandler import OpenApiHandler
+from .yamlEncoder import yamlEncoder
 
 
 type OpenApiConfigurator = OpenApiConfigurator
@@ -20,35 +28,85 @@ class OpenApiConfigurator:
     """
 
     __app:tornado.web.Application
+    __cacheControl:str|None
+    __chunkSize:int|None
+    __contentHashedUrls:bool
+    __eager:bool
+    __encoders:dict[str,Callable[[bytes],bytes]]
+    __executor:Executor|None
     __filter:Callable[[str], bool]
     __info:Info
+    __inlineSpec:bool
+    __jsonEncoder:Callable[[Any],bytes]
     __pattern:str
+    __prebuiltPath:str|None
     __securitySchemes:dict[str,SecurityScheme]
+    __shardByTag:bool
+    __staticFilesCacheSize:int|None
+    __staticFilesMaxAge:int|None
     __staticFilesPath:str 
+    __staticFilesRevalidate:bool
+    __yamlEncoder:Callable[[Any],bytes]
 
     def __init__(self, app:tornado.web.Application) -> None:
         self.__app = app
+        self.__cacheControl = 'no-cache'
+        self.__chunkSize = 65536
+        self.__contentHashedUrls = False
+        self.__eager = False
+        self.__encoders = { 'gzip': gzipEncoder }
+        self.__executor = None
         self.__filter = lambda e: True
         self.__info = None
+        self.__inlineSpec = False
+        self.__jsonEncoder = compactJsonEncoder
         self.__pattern = r'/(swagger.*)'
+        self.__prebuiltPath = None
         self.__securitySchemes = dict[str,SecurityScheme]()
+        self.__shardByTag = False
+        self.__staticFilesCacheSize = 16777216
+        self.__staticFilesMaxAge = 0
         self.__staticFilesPath = './swagger-ui'
+        self.__staticFilesRevalidate = True
+        self.__yamlEncoder = yamlEncoder
 
     def commit(self, host:str|list[str] = '.*') -> OpenApiConfiguration:
         """
         Finalizes the configuration and configures Tornado to handle relevant requests.
         """
         result = OpenApiConfiguration()
+        result.cacheControl = self.__cacheControl
+        result.chunkSize = self.__chunkSize
+        result.contentHashedUrls = self.__contentHashedUrls
+        result.encoders = self.__encoders
+        result.executor = self.__executor
         result.securitySchemes = self.__securitySchemes
+        result.shardByTag = self.__shardByTag
         result.filter = self.__filter
         result.info = self.__info
+        result.inlineSpec = self.__inlineSpec
+        result.jsonEncoder = self.__jsonEncoder
         result.pattern = self.__pattern
+        result.prebuiltPath = self.__prebuiltPath
+        result.staticFilesCacheSize = self.__staticFilesCacheSize
+        result.staticFilesMaxAge = self.__staticFilesMaxAge
         result.staticFilesPath = self.__staticFilesPath
+        result.staticFilesRevalidate = self.__staticFilesRevalidate
+        result.yamlEncoder = self.__yamlEncoder
         if type(host) is str:
             self.__app.add_handlers(host, [(self.__pattern, OpenApiHandler, { 'oaconfig':result })])
         else:
             for h in host:
                 self.__app.add_handlers(h, [(self.__pattern, OpenApiHandler, { 'oaconfig':result })])
+        if self.__eager:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # NOTE: no IOLoop is running (such as when an application is set up before `asyncio.run()`) so a callback would never run, build now instead; handlers added after `commit()` are converted on first request
+                result.warm(self.__app)
+            else:
+                # NOTE: deferred until the IOLoop runs, so handlers added after `commit()` are included in the build; built on the executor if one is configured
+                tornado.ioloop.IOLoop.current().add_callback(result.warm if result.executor is None else result.warmAsync, self.__app)
         return result
     
     def pattern(self, pattern:str) -> OpenApiConfigurator:
@@ -58,13 +116,126 @@ class OpenApiConfigurator:
         self.__pattern = pattern
         return self
     
+    def cacheControl(self, value:str|None) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Sets the ``Cache-Control`` header sent with OAS documents, such as ``'public, max-age=300'``. Pass ``None`` to omit the header. Default is ``'no-cache'``.
+
+        OAS documents are always sent with a strong ``ETag``, allowing clients and intermediaries to revalidate with ``If-None-Match`` and receive a ``304 Not Modified`` when nothing has changed.
+        """
+        self.__cacheControl = value
+        return self
+
+    def chunkSize(self, size:int|None) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Sets the maximum number of bytes written before awaiting a flush when serving OAS documents. Default is ``65536``.
+
+        Large documents are streamed to the client from the cached document in chunks, rather than being copied into tornado's output buffer in full for every request. Pass ``None`` to write documents in a single call.
+        """
+        self.__chunkSize = size
+        return self
+
+    def contentHashedUrls(self, enabled:bool = True) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Serves OAS documents at content-addressed urls, such as ``swagger.0123456789abcdef.json``, and rewrites the ``swagger-ui`` initializer to use them. Default is ``False``.
+
+        Content-addressed urls are served with ``Cache-Control: public, max-age=31536000, immutable``, allowing browsers and CDNs to cache them forever. When the document changes its url changes, and requests for an outdated url are redirected to the current one.
+        """
+        self.__contentHashedUrls = enabled
+        return self
+
+    def eager(self, enabled:bool = True) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Enables eager building of the OAS document, so that the first request is served from memory. Default is ``False``.
+
+        When ``commit()`` is called from a running ``IOLoop`` the build is scheduled, and runs after your startup code has finished adding handlers (on the :py:meth:`executor` if one is configured, otherwise on the ``IOLoop``.) Otherwise (such as when the application is set up before calling ``asyncio.run()``) the build runs immediately, and any handlers added after ``commit()`` are added to the document on first request. Build timings are logged to ``tornado.application``. Alternatively, call :py:meth:`~tornado_openapi.OpenApiConfiguration.warm` yourself.
+        """
+        self.__eager = enabled
+        return self
+
+    def encoder(self, name:str, encoder:Callable[[bytes],bytes]|None) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Adds (or replaces) an encoder used to pre-compress OAS documents. By default only ``gzip`` is configured.
+
+        Encoders run once per build, not once per request. For example, if the ``brotli`` package is installed:
+
+        .. code:: python
+
+            configurator.encoder('br', brotli.compress)
+
+        :param str name: The ``Content-Encoding`` name clients will request, such as ``'br'``.
+        :param Callable encoder: A function which accepts and returns ``bytes``. Pass ``None`` to remove an encoder.
+        """
+        if encoder is None:
+            self.__encoders.pop(name, None)
+        else:
+            self.__encoders[name] = encoder
+        return self
+
+    def prebuilt(self, path:str|None) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Serves a prebuilt OAS document from disk, instead of interrogating routes. Default is ``None``.
+
+        The file is served from a read-only memory map, so many worker processes on a host share one copy in the page cache. Pre-compressed sidecar files written by ``python -m tornado_openapi export --compress`` (such as ``swagger.json.gz``) are served the same way, unless they are older than the document.
+
+        NOTE: while being served the file must only ever be replaced atomically, by writing a new file and renaming it over the original (as ``export`` does), and never rewritten in place (such as with ``cp``.) Reading a memory mapped file which has been truncated crashes the process with ``SIGBUS``.
+
+        :param str path: The path of a prebuilt JSON document, such as one written by ``python -m tornado_openapi export``.
+        """
+        self.__prebuiltPath = path
+        return self
+
     def staticFilesPath(self, path:str) -> OpenApiConfigurator:
         """
         OPTIONAL. Sets the path (relative or absolute) where ``swagger-ui`` static files can be found. Default is ``"./swagger-ui"``.
+
+        The path may also be a zip file, or a directory within a zip file (such as ``"./app.pyz/swagger-ui"``), in which case files are served directly from the zip file without being extracted to disk.
         """
         self.__staticFilesPath = path
         return self
 
+    def staticFilesResources(self, package:str, path:str = '') -> OpenApiConfigurator:
+        """
+        OPTIONAL. Serves ``swagger-ui`` static files from package resources, using ``importlib.resources``. This works whether the package is installed as files on disk, or imported from a zip file (such as a zipapp.)
+
+        :param str package: The name of the package containing the static files, such as ``'myapp'``.
+        :param str path: The path of the static files within the package, such as ``'swagger-ui'``.
+        """
+        resources = importlib.resources.files(package).joinpath(path)
+        if isinstance(resources, pathlib.Path):
+            self.__staticFilesPath = str(resources)
+        elif isinstance(resources, zipfile.Path):
+            self.__staticFilesPath = os.path.normpath(os.path.join(resources.root.filename, resources.at))
+        else:
+            raise ValueError(f'Resources of {package!r} are not stored on disk or in a zip file.')
+        return self
+
+    def staticFilesCacheSize(self, size:int|None) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Sets the maximum number of bytes of ``swagger-ui`` static files held in memory. Default is ``16777216`` (16 MiB.)
+
+        Static files are served from memory once loaded, the least recently used files are evicted when the limit is exceeded. Files larger than the limit are never cached, they are streamed from disk in ``chunkSize`` pieces (read on the ``executor``, if one is configured.) Pass ``None`` for no limit.
+        """
+        self.__staticFilesCacheSize = size
+        return self
+
+    def staticFilesMaxAge(self, seconds:int|None) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Sets the ``max-age`` (in seconds) sent in the ``Cache-Control`` header of ``swagger-ui`` static files, such as ``86400``. Default is ``0``, which sends ``Cache-Control: no-cache``.
+
+        Static files are always sent with a strong ``ETag`` and a ``Last-Modified`` header, so once ``max-age`` has elapsed (or when it is ``0``) clients revalidate and receive a ``304 Not Modified`` when nothing has changed.
+        """
+        self.__staticFilesMaxAge = seconds
+        return self
+
+    def staticFilesRevalidate(self, enabled:bool) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Controls whether cached ``swagger-ui`` static files are checked for changes on disk. Default is ``True``.
+
+        When ``True`` every request for a static file costs one ``stat`` call, so that edits to the files are picked up. In production, where the files do not change, pass ``False`` to serve cached files without touching the filesystem.
+        """
+        self.__staticFilesRevalidate = enabled
+        return self
+
     def info(self, info:Info) -> OpenApiConfigurator:
         """
         REQUIRED. Sets the Info Object for the endpoint.
@@ -72,6 +243,57 @@ class OpenApiConfigurator:
         self.__info = info
         return self
 
+    def inlineSpec(self, enabled:bool = True) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Embeds the OAS document in the ``swagger-ui`` initializer (as ``spec:``), instead of having ``swagger-ui`` fetch it (from ``url:``.) Default is ``False``.
+
+        This saves a round trip when loading ``swagger-ui``, which is noticeable for remote users. The embedded document is written from the same cached, serialized document served as ``swagger.json``, between the cached parts of the initializer either side of it. Compressed variants of the initializer are compressed as a whole (on the ``executor``, if one is configured) once per document, on first request.
+        """
+        self.__inlineSpec = enabled
+        return self
+
+    def shardByTag(self, enabled:bool = True) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Serves a sub-document for each tag, such as ``swagger/tags/{tag}.json``, and rewrites the ``swagger-ui`` initializer to list them. Default is ``False``.
+
+        Each sub-document contains only the operations with that tag, and only the component schemas those operations (transitively) require. ``swagger-ui`` presents the list of tags in its top bar, and only fetches and parses the selected one, which keeps very large APIs responsive. Sub-documents are built once per document, and cached alongside it.
+        """
+        self.__shardByTag = enabled
+        return self
+
+    def executor(self, executor:Executor = None) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Builds OAS documents on an executor (via ``IOLoop.run_in_executor``) instead of on the IOLoop, so that a cold build does not stall other requests. By default documents are built on the IOLoop.
+
+        Requests which arrive while a build is in progress all await that same build. The executor is also used to read static files which are too large to cache.
+
+        :param Executor executor: The executor to build on. If not provided, a dedicated single-threaded ``ThreadPoolExecutor`` is created.
+        """
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tornado-openapi') if executor is None else executor
+        return self
+
+    def jsonEncoder(self, encoder:Callable[[Any],bytes]) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Sets the function used to serialize OAS documents to JSON. Default is ``compactJsonEncoder``, which uses the standard library ``json`` module without insignificant whitespace.
+
+        The function receives a ``dict`` and must return UTF-8 encoded ``bytes``. A faster encoder can be plugged in when available, for example:
+
+        .. code:: python
+
+            configurator.jsonEncoder(orjson.dumps)
+        """
+        self.__jsonEncoder = encoder
+        return self
+
+    def yamlEncoder(self, encoder:Callable[[Any],bytes]) -> OpenApiConfigurator:
+        """
+        OPTIONAL. Sets the function used to serialize OAS documents to YAML, served when a ``.yaml`` document is requested. Default is a built-in, dependency-free encoder.
+
+        The function receives a ``dict`` and must return UTF-8 encoded ``bytes``.
+        """
+        self.__yamlEncoder = encoder
+        return self
+
     def filter(self, predicate:Callable[[str], bool]) -> OpenApiConfigurator:
         """
         OPTIONAL. Sets a filter allowing you to control which 'tags' or 'api groups' are included in the resulting OAS.
@@ -0,0 +1,182 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+from collections import OrderedDict
+from collections.abc import Iterable
+import json
+import threading
+import time
+from typing import Any, Callable
+
+from .CachedContent import CachedContent
+from .objects.OpenAPI import OpenAPI
+
+_maxSelections = 128
+_operationMethods = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace')
+_schemaRefPrefix = '#/components/schemas/'
+
+
+def _collectSchemaRefs(value:Any, refs:set[str]) -> None:
+    """Adds the name of every schema referenced (via ``$ref``) from ``value`` to ``refs``."""
+    if isinstance(value, dict):
+        for k,v in value.items():
+            if k == '$ref' and isinstance(v, str) and v.startswith(_schemaRefPrefix):
+                refs.add(v[len(_schemaRefPrefix):])
+            else:
+                _collectSchemaRefs(v, refs)
+    elif isinstance(value, list):
+        for e in value:
+            _collectSchemaRefs(e, refs)
+
+
+type OpenApiDocument = OpenApiDocument
+class OpenApiDocument:
+    """
+    A built OAS document, along with its serialized form.
+
+    Instances are treated as immutable once constructed, a rebuild produces a new instance.
+    """
+
+    __buildDuration:float
+    __encoders:dict[str,Callable[[bytes],bytes]]|None
+    __json:CachedContent
+    __jsonEncoder:Callable[[Any],bytes]
+    __oas:OpenAPI|None
+    __selectionsLock:threading.Lock
+    __selections:OrderedDict[tuple[frozenset[str]|None,frozenset[str]|None],OpenApiDocument]
+    __serializeDuration:float
+    __tags:list[str]|None
+    __yaml:CachedContent|None
+    __yamlLock:threading.Lock
+    __yamlEncoder:Callable[[Any],bytes]
+
+    def __init__(self, oas:OpenAPI|None, jsonEncoder:Callable[[Any],bytes], yamlEncoder:Callable[[Any],bytes], encoders:dict[str,Callable[[bytes],bytes]] = None, buildDuration:float = 0.0, content:CachedContent = None) -> None:
+        """
+        :param OpenAPI oas: The document to serialize. May be ``None`` if ``content`` is provided, in which case it is parsed from ``content`` on demand.
+        :param CachedContent content: An already serialized (JSON) document, such as one produced by ``python -m tornado_openapi export``.
+        """
+        started = time.perf_counter()
+        self.__oas = oas
+        self.__encoders = encoders
+        self.__json = content if content is not None else CachedContent(jsonEncoder(oas.asDictionary()), 'application/json', encoders)
+        self.__jsonEncoder = jsonEncoder
+        self.__selections = OrderedDict[tuple[frozenset[str]|None,frozenset[str]|None],OpenApiDocument]()
+        self.__selectionsLock = threading.Lock()
+        self.__tags = None
+        self.__yaml = None
+        self.__yamlLock = threading.Lock()
+        self.__yamlEncoder = yamlEncoder
+        self.__buildDuration = buildDuration
+        self.__serializeDuration = time.perf_counter() - started
+
+    @property
+    def buildDuration(self) -> float:
+        """The time (in seconds) spent interrogating routes and metadata to build the document."""
+        return self.__buildDuration
+
+    @property
+    def json(self) -> CachedContent:
+        """The serialized (JSON) document."""
+        return self.__json
+
+    @property
+    def oas(self) -> OpenAPI:
+        """The OpenAPI Object the document was serialized from."""
+        if self.__oas is None:
+            self.__oas = OpenAPI(json.loads(self.__json.content[:]))
+        return self.__oas
+
+    @property
+    def serializeDuration(self) -> float:
+        """The time (in seconds) spent serializing and encoding the document."""
+        return self.__serializeDuration
+
+    @property
+    def tags(self) -> list[str]:
+        """The (sorted) names of all tags used by operations in the document."""
+        if self.__tags is None:
+            tags = set[str]()
+            for pathItem in (self.oas.get('paths', None) or {}).values():
+                for method in _operationMethods:
+                    tags.update((pathItem.get(method, None) or {}).get('tags', None) or [])
+            self.__tags = sorted(tags)
+        return self.__tags
+
+    @property
+    def yaml(self) -> CachedContent:
+        """The serialized (YAML) document. Serialized on first access, and then cached alongside the JSON document."""
+        if self.__yaml is None:
+            # NOTE: may be accessed from executor threads, concurrent requests serialize the document once
+            with self.__yamlLock:
+                if self.__yaml is None:
+                    self.__yaml = CachedContent(self.__yamlEncoder(self.oas.asDictionary()), 'application/yaml', self.__encoders)
+        return self.__yaml
+
+    def select(self, tags:Iterable[str]|None = None, paths:Iterable[str]|None = None) -> OpenApiDocument:
+        """
+        Returns a sub-document containing only the operations tagged with any of ``tags``, and whose path is (or is beneath) any of ``paths``, such as a per-tag shard of a very large document.
+
+        Only those ``components.schemas`` which are (transitively) referenced by the selected operations are included, all other components are included as-is. Sub-documents are built and serialized once, and then cached alongside this document. The 128 most recently used sub-documents are kept.
+
+        Selections are normalized before being cached, ``tags`` to those used in the document and ``paths`` to the document paths they select, so that equivalent selections (such as those naming paths not in the document) share one sub-document. This method is thread-safe, it may be called from an executor.
+
+        :param Iterable[str] tags: The tags to select, or ``None`` to select operations regardless of tags.
+        :param Iterable[str] paths: The paths to select, such as ``'/api/v2/users'`` which also selects ``'/api/v2/users/{id}'``, or ``None`` to select operations regardless of path.
+        """
+        source = self.oas.asDictionary()
+        selectedTags = None if tags is None else frozenset(tags).intersection(self.tags)
+        selectedPaths = None
+        if paths is not None:
+            prefixes = frozenset(e.rstrip('/') for e in paths)
+            # NOTE: a path is selected by any of its ancestors, such as `/api/v2/users/{id}` by `/api/v2/users`, `/api/v2`, `/api` or `/`
+            selectedPaths = frozenset(
+                path for path in (source.get('paths', None) or {}).keys()
+                if path in prefixes or any(path[:i] in prefixes for i,c in enumerate(path) if c == '/'))
+        key = (selectedTags, selectedPaths)
+        with self.__selectionsLock:
+            result = self.__selections.get(key, None)
+            if result is not None:
+                self.__selections.move_to_end(key)
+                return result
+        started = time.perf_counter()
+        # NOTE: the source document is never modified, only the containers which are filtered are copied
+        selected = dict[str,Any](source)
+        pathItems = dict[str,Any]()
+        for path,pathItem in (source.get('paths', None) or {}).items():
+            if selectedPaths is not None and path not in selectedPaths:
+                continue
+            operations = {
+                method:operation for method,operation in pathItem.items()
+                if method in _operationMethods and (selectedTags is None or not selectedTags.isdisjoint(operation.get('tags', None) or []))
+            }
+            if len(operations) > 0:
+                pathItems[path] = {
+                    k:v for k,v in pathItem.items()
+                    if k not in _operationMethods or k in operations
+                }
+        selected['paths'] = pathItems
+        if 'tags' in source and selectedTags is not None:
+            selected['tags'] = [tag for tag in source['tags'] if tag.get('name', None) in selectedTags]
+        components = source.get('components', None)
+        if components is not None and 'schemas' in components:
+            refs = set[str]()
+            _collectSchemaRefs(pathItems, refs)
+            _collectSchemaRefs({ k:v for k,v in components.items() if k != 'schemas' }, refs)
+            schemas = components['schemas']
+            pending = list(refs)
+            while len(pending) > 0:
+                nested = set[str]()
+                _collectSchemaRefs(schemas.get(pending.pop(), None), nested)
+                pending.extend(nested - refs)
+                refs.update(nested)
+            selected['components'] = dict[str,Any](components)
+            selected['components']['schemas'] = { name:schema for name,schema in schemas.items() if name in refs }
+        result = OpenApiDocument(OpenAPI(selected), self.__jsonEncoder, self.__yamlEncoder, self.__encoders, time.perf_counter() - started)
+        with self.__selectionsLock:
+            # NOTE: a concurrent call may have built the same selection, the first one cached is kept
+            result = self.__selections.setdefault(key, result)
+            self.__selections.move_to_end(key)
+            while len(self.__selections) > _maxSelections:
+                # least recently used first
+                self.__selections.popitem(last=False)
+        return result
@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from concurrent.futures import Executor
+import threading
+import time
+from typing import ForwardRef
+import tornado
+import tornado.ioloop
+import tornado.web
+
+from .CachedContent import CachedContent
+from .MetaManager import MetaManager
+from .OpenApiBuilder import OpenApiBuilder
+from .OpenApiDocument import OpenApiDocument
+
+OpenApiConfiguration = ForwardRef('OpenApiConfiguration')
+
+
+class OpenApiDocumentCache:
+    """
+    Caches the OAS document built for an :py:class:`~tornado_openapi.OpenApiConfiguration`.
+
+    When :py:attr:`~tornado_openapi.OpenApiConfiguration.prebuiltPath` is set the document is loaded from disk instead, and is never rebuilt.
+
+    Otherwise, the cached document is rebuilt when :py:class:`~tornado_openapi.MetaManager` metadata or the routing rules of the application change. Only new rules (such as when ``add_handlers`` is called at runtime) and rules targeting handlers whose metadata changed are converted, the operations of all other rules are reused.
+    """
+
+    __builder:OpenApiBuilder|None
+    __configuration:OpenApiConfiguration
+    __document:OpenApiDocument|None
+    __frozen:bool
+    __lock:threading.Lock
+    __metaVersion:int
+    __pending:asyncio.Future|None
+    __ruleCount:int
+
+    def __init__(self, configuration:OpenApiConfiguration) -> None:
+        self.__builder = None
+        self.__configuration = configuration
+        self.__document = None
+        self.__frozen = False
+        self.__lock = threading.Lock()
+        self.__metaVersion = -1
+        self.__pending = None
+        self.__ruleCount = -1
+
+    def __countRules(self, rules:list[tornado.routing.Rule]) -> int:
+        result = len(rules)
+        for rule in rules:
+            if isinstance(rule.target, tornado.web._ApplicationRouter):
+                result += self.__countRules(rule.target.rules)
+        return result
+
+    @property
+    def document(self) -> OpenApiDocument|None:
+        """The most recently built document, if any. May be stale, prefer :py:meth:`resolve`."""
+        return self.__document
+
+    @property
+    def isFrozen(self) -> bool:
+        """``True`` if the cache has been frozen, see :py:meth:`freeze`."""
+        return self.__frozen
+
+    def freeze(self) -> None:
+        """
+        Stops checking the cached document for staleness, it will be served as-is until :py:meth:`invalidate` is called.
+
+        Staleness checks walk the routing rules of the application on every request, which (in a forked worker) touches reference counts on objects inherited from the parent process and causes their memory pages to be copied.
+        """
+        self.__frozen = True
+
+    def invalidate(self) -> None:
+        """Discards the cached document, forcing a full rebuild on next access. Also reverses :py:meth:`freeze`."""
+        self.__builder = None
+        self.__document = None
+        self.__frozen = False
+
+    def isStale(self, application:tornado.web.Application) -> bool:
+        """Returns ``True`` if there is no cached document, or if the cached document no longer reflects the application."""
+        if self.__frozen or self.__configuration.prebuiltPath is not None:
+            # a frozen or prebuilt document is never rebuilt
+            return self.__document is None
+        return self.__document is None\
+            or self.__metaVersion != MetaManager.instance().version\
+            or self.__ruleCount != self.__countRules(application.default_router.rules)
+
+    def resolve(self, application:tornado.web.Application) -> OpenApiDocument:
+        """Returns the cached document for ``application``, building it first if it is missing or stale."""
+        with self.__lock:
+            if self.isStale(application) and self.__configuration.prebuiltPath is not None:
+                started = time.perf_counter()
+                content = CachedContent.load(self.__configuration.prebuiltPath, 'application/json', self.__configuration.encoders)
+                self.__document = OpenApiDocument(None, self.__configuration.jsonEncoder, self.__configuration.yamlEncoder, self.__configuration.encoders, time.perf_counter() - started, content)
+            elif self.isStale(application):
+                started = time.perf_counter()
+                ruleCount = self.__countRules(application.default_router.rules)
+                if self.__builder is None:
+                    self.__builder = OpenApiBuilder(application, self.__configuration)
+                # NOTE: only rules added since the last build (or targeting handlers whose metadata changed) are converted
+                oas = self.__builder.build()
+                # NOTE: captured after building, schema resolution during a build may register new schemas
+                self.__metaVersion = MetaManager.instance().version
+                self.__ruleCount = ruleCount
+                self.__document = OpenApiDocument(oas, self.__configuration.jsonEncoder, self.__configuration.yamlEncoder, self.__configuration.encoders, time.perf_counter() - started)
+            return self.__document
+
+    async def resolveAsync(self, application:tornado.web.Application, executor:Executor|None) -> OpenApiDocument:
+        """
+        Returns the cached document for ``application``, building it on ``executor`` (via ``IOLoop.run_in_executor``) if it is missing or stale, so that the IOLoop is not blocked by a build.
+
+        Concurrent callers share a single build, rather than each starting their own.
+        """
+        if not self.isStale(application):
+            return self.__document
+        pending = self.__pending
+        if pending is None:
+            pending = tornado.ioloop.IOLoop.current().run_in_executor(executor, self.resolve, application)
+            self.__pending = pending
+            def clearPending(f:asyncio.Future) -> None:
+                if self.__pending is f:
+                    self.__pending = None
+            pending.add_done_callback(clearPending)
+        return await pending
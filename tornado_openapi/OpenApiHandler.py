@@ -1,17 +1,24 @@
 # SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
 # SPDX-License-Identifier: MIT
 
-import inspect
+from collections.abc import Buffer
+import datetime
+import email.utils
 import json
-import os
 import re
-from typing import Any
 import tornado
+import tornado.ioloop
 import tornado.web
+import urllib.parse
 
-from .MetaManager import MetaManager
+from .CachedContent import CachedContent
 from .OpenApiConfiguration import OpenApiConfiguration
-from .objects import Components, OpenAPI, Parameter, ParameterLocation, Paths, PathItem, Schema, SecurityRequirement, Operation
+from .OpenApiDocument import OpenApiDocument
+from .StaticFile import StaticFile
+
+_hashedNamePattern = re.compile(r'^(?P<name>.+)\.(?P<digest>[0-9a-f]{16})\.(?P<extension>json|yaml)$')
+_immutableCacheControl = 'public, max-age=31536000, immutable'
+_initializerUrlPattern = re.compile(rb'url:[^,]+,')
 
 
 class OpenApiHandler(tornado.web.RequestHandler):
@@ -20,214 +27,258 @@ class OpenApiHandler(tornado.web.RequestHandler):
     """
 
     __configuration:OpenApiConfiguration
-    __requiredSchemas:set[str]
     __swaggerJsonUrl:str
 
-    def __init__(self, application:tornado.web.Application, request:tornado.httputil.HTTPServerRequest, **kwargs) -> None:
-        self.__requiredSchemas = set[str]()
-        super().__init__(application, request, **kwargs)
-
-    def __resolveTagsFor(self, handler:Any|None = None, action:Any|None = None) -> list[str]|None:
-        handlerTags = [] if handler is None else MetaManager.instance().tags.get(handler, [])
-        actionTags = [] if action is None else MetaManager.instance().tags.get(action, [])
-        tags = handlerTags + actionTags
-        return tags
-    
-    def __getSchemaForParameter(self, oas:OpenAPI, parameter:inspect.Parameter) -> Schema:
-        # built-in types (str, int, float, etc)
-        schema = MetaManager.instance().getSchemaForType(parameter.annotation)
-        return schema
-    
-    def __tryParameterizePath(self, path:str, positionalParameters:list[str], keywordParameters:list[str], parameters:list[Parameter]) -> tuple[bool, str]:
+    def __getListArgument(self, name:str) -> list[str]|None:
         """
-        Tries to parameterize the path string for the provided parameter names.
-
-        :returns tuple[bool, str]: a tuple containing a bool indicating if parameters could be matched in the path string, and the resulting path string (whether or not parameters matched.)
+        Returns the values of a (possibly repeated) comma-separated query argument, or ``None`` if it was not provided.
+        """
+        values = self.get_query_arguments(name)
+        if len(values) == 0:
+            return None
+        return [e.strip() for value in values for e in value.split(',') if len(e.strip()) > 0]
 
-        ---
-        NOTE: Currently, Tornado enforces that all regex captures in a path are either all "named", or all "unnamed", but does not allow a mixture of named and unnamed. This method, however, supports a mixture of named and unnamed.
+    def __hashedName(self, name:str, content:CachedContent) -> str:
         """
-        # tornado supports named captures.
-        #
-        # unnamed captures must be matched by position (aka positional args), named captures
-        # are mapped to kwargs by tornado.
+        Inserts a (truncated) content hash into a file name or url, such as ``swagger.json`` becoming ``swagger.0123456789abcdef.json``.
+        """
+        base, _, extension = name.rpartition('.')
+        return f'{base}.{content.digest[:16]}.{extension}'
+
+    async def __resolveDocument(self) -> OpenApiDocument:
+        # the cached document is only rebuilt when routes or metadata change
+        if self.__configuration.executor is None:
+            return self.__configuration.cache.resolve(self.application)
+        else:
+            return await self.__configuration.cache.resolveAsync(self.application, self.__configuration.executor)
 
-        # for testing querystring parameters
-        def isQueryStringParameter(name:str, parameterizedPath:str) -> bool:
-            queryStringDelimiterMatch = re.search(r'[^\(]\?', parameterizedPath)
-            if queryStringDelimiterMatch is None:
-                return False
-            queryStringMinimumPosition = None if queryStringDelimiterMatch is None else queryStringDelimiterMatch.span(0)[1]
-            queryStringParameterMatch:re.Match = re.search(name + r'=\{' + name + r'\}', parameterizedPath)
-            return queryStringParameterMatch is not None and queryStringParameterMatch.span(0)[0] >= queryStringMinimumPosition
+    async def __selectDocument(self, document:OpenApiDocument, tags:list[str]|None, paths:list[str]|None) -> OpenApiDocument:
+        # sub-documents are built (and serialized) on first use, as documents are, on the executor if one is configured
+        if self.__configuration.executor is None:
+            return document.select(tags, paths)
+        else:
+            return await tornado.ioloop.IOLoop.current().run_in_executor(self.__configuration.executor, document.select, tags, paths)
 
-        # replace named/keyword parameters
-        result = path
-        for name in [e for e in keywordParameters]:
-            result, count = re.subn(r'\(\?P\<' + name + r'\>[^\)]+\)', f'{{{name}}}', result)
-            if count > 0:
-                positionalParameters.remove(name)
-                keywordParameters.remove(name)
+    async def __serializeYaml(self, document:OpenApiDocument) -> CachedContent:
+        # the YAML document is serialized (and encoded) on first use, on the executor if one is configured
+        if self.__configuration.executor is None:
+            return document.yaml
+        else:
+            return await tornado.ioloop.IOLoop.current().run_in_executor(self.__configuration.executor, lambda: document.yaml)
 
-        # replace unnamed/positional parameters
-        def repl(m:re.Match) -> str:
-            nonlocal positionalParameters
-            if len(positionalParameters) > 0:
-                name = positionalParameters[0]
-                keywordParameters.remove(name)
-                positionalParameters.pop(0)
-                return f'{{{name}}}'
-            else:
-                return m.group(0)
+    def __isNotModified(self, content:CachedContent) -> bool:
+        """
+        Returns ``True`` if the client already has ``content``, based on ``If-None-Match`` or (only when absent) ``If-Modified-Since``.
+        """
+        if 'If-None-Match' in self.request.headers:
+            return self.check_etag_header()
+        ifModifiedSince = self.request.headers.get('If-Modified-Since', None)
+        if ifModifiedSince is None or content.lastModified is None:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(ifModifiedSince)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        return content.lastModified <= since
 
-        # finalize            
-        result = re.sub(r'\([^\?\)]+\)', repl, result)
-        wasSuccessful = len(keywordParameters) == 0 and len(positionalParameters) == 0 and re.search(r'\([^\)]+\)', result) == None
-        if wasSuccessful:
-            # configure parameters as "querystring" parameters or "path" parameters
-            for p in parameters:
-                if p.location is None:
-                    p.location = ParameterLocation.QUERY if isQueryStringParameter(p.name, result) else ParameterLocation.PATH
-        return (wasSuccessful, result)
+    def __staticCacheControl(self) -> str:
+        maxAge = self.__configuration.staticFilesMaxAge
+        return 'no-cache' if maxAge is None or maxAge <= 0 else f'public, max-age={maxAge}'
 
-    def __iterateRules(self, oas:OpenAPI, rules:list[tornado.web.Rule], paths:Paths) -> Paths:
-        for rule in rules:
-            if isinstance(rule.matcher, tornado.routing.PathMatches):
-                m:tornado.routing.PathMatches = rule.matcher
-                path = m.regex.pattern.rstrip('$')
-                if issubclass(rule.target, tornado.web.RequestHandler):
-                    for actionName in ['delete', 'get', 'head', 'options', 'patch', 'post', 'put', 'trace']:
-                        action = rule.target.__dict__.get(actionName, None)
-                        while hasattr(action, '__wrapped__'):
-                            action = getattr(action, '__wrapped__')
-                        if action is not None:
-                            operation = Operation()
-                            # tags
-                            tags = self.__resolveTagsFor(rule.target, action)
-                            # parameters (args and kwargs)
-                            parameters = list[Parameter]()
-                            positionalParameterNames = []
-                            keywordParameterNames = []
-                            signature = inspect.signature(action)
-                            for v in signature.parameters.values():
-                                if v.name == 'self' or v.name == 'cls':
-                                    continue
-                                parameter = Parameter()
-                                parameter.name = v.name
-                                parameter.schema
-                                schema = self.__getSchemaForParameter(oas, v)
-                                if schema is not None:
-                                    parameter.schema = schema
-                                    # TODO: support `parameter.style` ?
-                                match v.kind:
-                                    case inspect._ParameterKind.KEYWORD_ONLY:
-                                        keywordParameterNames.append(parameter.name)
-                                    case inspect._ParameterKind.POSITIONAL_OR_KEYWORD:
-                                        positionalParameterNames.append(parameter.name)
-                                        keywordParameterNames.append(parameter.name)
-                                    case inspect._ParameterKind.POSITIONAL_ONLY:
-                                        positionalParameterNames.append(parameter.name)
-                                parameters.append(parameter)
+    def __negotiateRange(self, size:int, etag:str) -> tuple[int,int]|None:
+        """
+        Returns the ``(start, end)`` offsets of the byte range requested by the client, or ``None`` to send the whole content. An unsatisfiable range is returned as ``(size, size)``.
 
-                            # parameters (headers)
-                            headers = MetaManager.instance().headers.get(action, None)
-                            if headers is not None:
-                                for header in headers.values():
-                                    parameters.append(header)
+        Only a single range is supported, a request for multiple ranges receives the whole content (as permitted by RFC 9110.)
+        """
+        requestedRange = self.request.headers.get('Range', None)
+        if requestedRange is None or not requestedRange.startswith('bytes='):
+            return None
+        ifRange = self.request.headers.get('If-Range', None)
+        if ifRange is not None and ifRange != etag:
+            # the client's partial copy is outdated (or validated by date, which is not supported), send everything
+            return None
+        first, _, last = requestedRange[6:].strip().partition('-')
+        if ',' in last:
+            return None
+        try:
+            if len(first) == 0:
+                # a suffix range, such as `bytes=-500` for the last 500 bytes
+                suffixLength = int(last)
+                return (size, size) if suffixLength <= 0 or size == 0 else (max(size - suffixLength, 0), size)
+            start = int(first)
+            end = size if len(last) == 0 else min(int(last) + 1, size)
+        except ValueError:
+            return None
+        if start >= size:
+            return (size, size)
+        return None if end <= start else (start, end)
 
-                            # parameters (cookies)
-                            cookies = MetaManager.instance().cookies.get(action, None)
-                            if cookies is not None:
-                                for cookie in cookies.values():
-                                    parameters.append(cookie)
+    def __negotiateEncoding(self, available:dict[str,bytes]) -> str|None:
+        """
+        Selects the smallest available encoding acceptable to the client, or ``None`` for identity.
+        """
+        acceptEncoding = self.request.headers.get('Accept-Encoding', None)
+        if acceptEncoding is None or len(available) == 0:
+            return None
+        accepted = dict[str,float]()
+        for e in acceptEncoding.split(','):
+            parts = e.strip().split(';')
+            name = parts[0].strip().lower()
+            q = 1.0
+            for param in parts[1:]:
+                k,_,v = param.strip().partition('=')
+                if k.strip() == 'q':
+                    try:
+                        q = float(v)
+                    except ValueError:
+                        q = 0.0
+            accepted[name] = q
+        wildcard = accepted.get('*', 0.0)
+        candidates = [
+            name for name in available.keys()
+            if accepted.get(name, wildcard) > 0.0
+        ]
+        if len(candidates) == 0:
+            return None
+        return min(candidates, key=lambda name: len(available[name]))
 
-                            if len(parameters) > 0:
-                                operation.parameters = parameters
+    async def __writeChunked(self, *bufs:Buffer) -> None:
+        """
+        Writes ``bufs`` (in order) in chunks of (at most) ``chunkSize`` bytes, flushing after each, so that tornado never holds more than one chunk of the body in its own buffers.
+        """
+        chunkSize = self.__configuration.chunkSize
+        size = sum(len(buf) for buf in bufs)
+        if chunkSize is None or chunkSize <= 0 or size <= chunkSize:
+            for buf in bufs:
+                # NOTE: slicing converts other buffer types (such as `mmap`) into `bytes`
+                self.write(buf if isinstance(buf, bytes) else buf[:])
+        else:
+            # NOTE: the length is known up front, so the response is not sent using chunked transfer-encoding
+            self.set_header('Content-Length', size)
+            for buf in bufs:
+                for offset in range(0, len(buf), chunkSize):
+                    self.write(buf[offset:offset+chunkSize])
+                    await self.flush()
 
-                            if len(positionalParameterNames) > 0 or len(keywordParameterNames) > 0:
-                                # there are params, require matching function to successfully match them all
-                                pathMatched, parameterizedPath = self.__tryParameterizePath(path, positionalParameterNames, keywordParameterNames, parameters)
-                            elif re.search(r'\([^\)]+\)', path) is None and (len(signature.parameters) == 0 or (len(signature.parameters) == 1 and signature.parameters.get('self', None) is not None)):
-                                # there were no params, pseudo a match success (params are not required for an enpoint to invoke)
-                                pathMatched = True
-                                parameterizedPath = path
-                            else:
-                                # in this branch the endpoint path contained params, but no params were extracted. this should never happen, but for completeness we pseudo a match failure
-                                pathMatched = False
-                                parameterizedPath = path
+    def __setEncodingHeaders(self, content:CachedContent, encoding:str|None) -> None:
+        if len(content.encodings) > 0 and not any(t is tornado.web.GZipContentEncoding for t in self.application.transforms):
+            # NOTE: when `compress_response` is enabled tornado adds `Vary` itself
+            self.set_header('Vary', 'Accept-Encoding')
+        if encoding is not None:
+            # NOTE: tornado's `compress_response` transform will not re-encode a response which already has a `Content-Encoding`
+            self.set_header('Content-Encoding', encoding)
 
-                            # request bodies
-                            operation.requestBody = MetaManager.instance().requests.get(action, None)
-                            # if operation.requestBody is not None:
-                            #     self.__logger.debug(f'no requestBody for {action} on {rule.target.__name__}')
+    async def __writeContent(self, content:CachedContent, cacheControl:str|None, acceptRanges:bool = False) -> None:
+        byteRange = None
+        if acceptRanges:
+            self.set_header('Accept-Ranges', 'bytes')
+            byteRange = self.__negotiateRange(len(content.content), content.etag)
+        # NOTE: ranges are only served from the unencoded content
+        encoding = None if byteRange is not None else self.__negotiateEncoding(content.encodings)
+        self.set_header('Content-Type', content.contentType)
+        self.set_header('Etag', content.etagFor(encoding))
+        if content.lastModified is not None:
+            self.set_header('Last-Modified', content.lastModified)
+        if cacheControl is not None:
+            self.set_header('Cache-Control', cacheControl)
+        self.__setEncodingHeaders(content, encoding)
+        if self.__isNotModified(content):
+            # client already has this exact content, skip the body entirely
+            self.set_status(304)
+        elif byteRange is not None:
+            if self.__writeRangeHeaders(byteRange, len(content.content)):
+                await self.__writeChunked(content.content[byteRange[0]:byteRange[1]])
+        else:
+            await self.__writeChunked(content.content if encoding is None else content.encodings[encoding])
 
-                            # response(s)
-                            operation.responses = MetaManager.instance().responses.get(action, None)
+    async def __writeFile(self, file:StaticFile, cacheControl:str|None) -> None:
+        """
+        Streams a file too large to cache from disk, reading (at most) ``chunkSize`` bytes at a time and flushing after each. When an ``executor`` is configured reads are performed on it, rather than on the IOLoop.
+        """
+        self.set_header('Accept-Ranges', 'bytes')
+        self.set_header('Content-Type', file.contentType)
+        self.set_header('Etag', file.etag)
+        self.set_header('Last-Modified', file.lastModified)
+        if cacheControl is not None:
+            self.set_header('Cache-Control', cacheControl)
+        if self.__isNotModified(file):
+            self.set_status(304)
+            return
+        start, end = 0, file.size
+        byteRange = self.__negotiateRange(file.size, file.etag)
+        if byteRange is not None:
+            if not self.__writeRangeHeaders(byteRange, file.size):
+                return
+            start, end = byteRange
+        chunkSize = self.__configuration.chunkSize
+        chunkSize = 65536 if chunkSize is None or chunkSize <= 0 else chunkSize
+        executor = self.__configuration.executor
+        self.set_header('Content-Length', end - start)
+        with open(file.path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                if executor is None:
+                    chunk = f.read(min(chunkSize, remaining))
+                else:
+                    chunk = await tornado.ioloop.IOLoop.current().run_in_executor(executor, f.read, min(chunkSize, remaining))
+                if len(chunk) == 0:
+                    # the file was truncated after it was opened, tornado will fail the response due to the short body
+                    break
+                remaining -= len(chunk)
+                self.write(chunk)
+                await self.flush()
 
-                            tags = [t for t in tags if self.__configuration.filter(t)]
-                            if pathMatched and tags is not None and len(tags) > 0:
-                                # update required schemas (request bodies)
-                                if operation.requestBody is not None:
-                                    for k,v in operation.requestBody.content.items():
-                                        schemaRef = v.schema.get('$ref', None)
-                                        if schemaRef is not None:
-                                            self.__requiredSchemas.add(schemaRef)
-                                # update required schemas (parameters)
-                                if operation.parameters is not None:
-                                    for p in operation.parameters:
-                                        schemaRef = p.get('$ref', None)
-                                        if schemaRef is not None:
-                                            self.__requiredSchemas.add(schemaRef)
-                                # update required schemas (responses)
-                                if operation.responses is not None:
-                                    for code,r in operation.responses.asDictionary().items():
-                                        if r.get('content', None) is not None:
-                                            for k,v in r['content'].items():
-                                                s = v.get('schema', None)
-                                                schemaRef = None if s is None else s.get('$ref', None)
-                                                if schemaRef is not None:
-                                                    self.__requiredSchemas.add(schemaRef)
-                                # security requirements
-                                securityRequirements = MetaManager.instance().security.get(action, None)
-                                if securityRequirements is None:
-                                    securityRequirements = MetaManager.instance().security.get(rule.target, None)
-                                if securityRequirements is not None:
-                                    operation.security = securityRequirements
-                                operation.tags = tags
-                                pathItem = paths[parameterizedPath]
-                                if pathItem is None:
-                                    pathItem = PathItem()
-                                pathItem[actionName] = operation
-                                paths[parameterizedPath] = pathItem
-            if isinstance(rule.target, tornado.web._ApplicationRouter):
-                router:tornado.web._ApplicationRouter = rule.target
-                self.__iterateRules(oas, router.rules, paths)
-        return paths
+    async def __writeInlined(self, initializer:CachedContent|StaticFile, prefix:CachedContent, document:CachedContent, suffix:CachedContent) -> None:
+        """
+        Writes the ``swagger-ui`` initializer with the OAS document embedded in it, as ``prefix``, ``document`` and ``suffix``, so the unencoded document is written from the cached document rather than from a copy of it.
 
-    def __buildOpenApiSchema(self) -> OpenAPI:
-        oas:OpenAPI = OpenAPI()
-        oas.info = self.__configuration.info
- 
-        # TODO: oas.servers = servers
+        Encoded variants are encoded as a whole (on the executor, if one is configured) once per document, on first request, and only variants for the current document are kept. The ETag is derived from the ETags of the initializer and the document.
+        """
+        available = {
+            name:document.encodings[name] for name in self.__configuration.encoders.keys()
+            if name in document.encodings
+        }
+        encoding = self.__negotiateEncoding(available)
+        etag = f'{initializer.etag[:-1]}-{document.etag[1:]}'
+        self.set_header('Content-Type', prefix.contentType)
+        self.set_header('Etag', etag if encoding is None else f'{etag[:-1]}-{encoding}"')
+        # NOTE: the initializer changes whenever the document does, so it must always be revalidated
+        self.set_header('Cache-Control', 'no-cache')
+        if len(available) > 0 and not any(t is tornado.web.GZipContentEncoding for t in self.application.transforms):
+            self.set_header('Vary', 'Accept-Encoding')
+        if encoding is not None:
+            self.set_header('Content-Encoding', encoding)
+        if 'If-None-Match' in self.request.headers and self.check_etag_header():
+            self.set_status(304)
+        elif encoding is None:
+            await self.__writeChunked(prefix.content, document.content, suffix.content)
+        else:
+            staticFilesCache = self.__configuration.staticFilesCache
+            encoded = staticFilesCache.encodedInlined(etag, encoding)
+            if encoded is None:
+                # NOTE: encoded as a whole, separately encoded parts cannot (in general) be concatenated
+                encoder = self.__configuration.encoders[encoding]
+                encode = lambda: encoder(b''.join((prefix.content, document.content, suffix.content)))
+                executor = self.__configuration.executor
+                encoded = encode() if executor is None else await tornado.ioloop.IOLoop.current().run_in_executor(executor, encode)
+                staticFilesCache.storeEncodedInlined(etag, encoding, encoded)
+            await self.__writeChunked(encoded)
 
-        # build paths
-        oas.paths = self.__iterateRules(oas, self.application.default_router.rules, Paths())
-        # build schema dictionary
-        components = Components(
-            schemas={
-                k.replace('#/components/schemas/',''):v
-                for k,v in MetaManager.instance().schemas.items()
-                # only include non-builtin types (by requiring schema name to start with #)
-                if k.startswith('#') and k in self.__requiredSchemas
-            },
-            securitySchemes=None if self.__configuration.securitySchemes is None or len(self.__configuration.securitySchemes) == 0 else {
-                k:v
-                for k,v in self.__configuration.securitySchemes.items()
-            }
-        )
-        oas.components = components
-        # result
-        return oas
+    def __writeRangeHeaders(self, byteRange:tuple[int,int], size:int) -> bool:
+        """
+        Sets the status and headers for a range response, returns ``False`` if the range is unsatisfiable and there is no body to write.
+        """
+        if byteRange[0] >= size:
+            self.set_status(416)
+            self.set_header('Content-Range', f'bytes */{size}')
+            return False
+        self.set_status(206)
+        self.set_header('Content-Range', f'bytes {byteRange[0]}-{byteRange[1]-1}/{size}')
+        return True
 
     def initialize(self, oaconfig:OpenApiConfiguration, swaggerJsonUrl:str = 'swagger.json') -> None:
         self.__configuration = oaconfig
@@ -236,43 +287,92 @@ class OpenApiHandler(tornado.web.RequestHandler):
     async def get(self, path:str) -> None:
         if path is None:
             raise tornado.web.HTTPError(500, reason = "Missing URI Path")
-        elif path.endswith('.json'):
-            # interrogate oas state and serialize to json
-            self.set_header('Content-Type', 'application/json')
-            result:OpenAPI = self.__buildOpenApiSchema()
-            self.write(json.dumps(result.asDictionary()))
-            pass
-        # elif path.endswith('.yaml'):
-        #     # TODO: interrogate oas state and serialize to yaml
-        #     self.set_header('Content-Type', 'application/yaml')
-        #     # TODO: this should only be performed with `extras` installed, since not everyone will appreciate addt'l dependencies
-        #     pass
+        elif path.endswith('.json') or path.endswith('.yaml'):
+            document = await self.__resolveDocument()
+            parts = path.split('/')
+            isShard = self.__configuration.shardByTag and len(parts) > 1 and parts[-2] == 'tags'
+            if isShard:
+                # a per-tag sub-document, such as `swagger/tags/{tag}.json`
+                tag = parts[-1].rpartition('.')[0]
+                if not tag in document.tags:
+                    raise tornado.web.HTTPError(404)
+                document = await self.__selectDocument(document, [tag], None)
+            selectedTags = self.__getListArgument('tags')
+            selectedPaths = self.__getListArgument('paths')
+            if selectedTags is not None or selectedPaths is not None:
+                # a filtered view of the document, such as `swagger.json?tags=Users,Groups`
+                document = await self.__selectDocument(document, selectedTags, selectedPaths)
+            content = document.json if path.endswith('.json') else await self.__serializeYaml(document)
+            cacheControl = self.__configuration.cacheControl
+            hashedNameMatch = _hashedNamePattern.match(parts[-1]) if self.__configuration.contentHashedUrls and not isShard else None
+            if hashedNameMatch is not None:
+                if hashedNameMatch.group('digest') != content.digest[:16]:
+                    # the document has changed since this url was issued, send the client to the current one
+                    currentName = self.__hashedName(f'{hashedNameMatch.group("name")}.{hashedNameMatch.group("extension")}', content)
+                    self.set_header('Cache-Control', 'no-cache')
+                    self.redirect(self.request.path.rpartition('/')[0] + '/' + currentName + ('' if len(self.request.query) == 0 else '?' + self.request.query))
+                    return
+                # the url changes whenever the content changes, so it can be cached forever
+                cacheControl = _immutableCacheControl
+            await self.__writeContent(content, cacheControl)
         else:
             # all other documents will be treated as static resources
-            # we strip off any path parts to load `swagger-ui` files directly from disk
+            # we strip off any path parts to serve `swagger-ui` files by name
             originalPath = path
             targetFile = '' if not '/' in path and not '.' in path else path.split('/')[-1]
             targetFile = 'index.html' if len(targetFile) <= 1 else targetFile
-            path = os.path.join(os.path.abspath(self.__configuration.staticFilesPath), targetFile)
-            if not os.path.isfile(path):
+            if targetFile != 'swagger-initializer.js':
+                content = self.__configuration.staticFilesCache.resolve(targetFile)
+                cacheControl = self.__staticCacheControl()
+            elif self.__configuration.shardByTag:
+                # rewrite initializer to offer a per-tag sub-document of "our" swagger.json for each tag
+                document = await self.__resolveDocument()
+                # NOTE: absolute urls, relative urls would resolve outside of the pattern when swagger-ui is requested without a trailing slash (such as `/api/v2/swagger`)
+                base = self.request.path[:len(self.request.path)-len(originalPath)] + 'swagger/tags/'
+                urls = ','.join(
+                    f'{{url:{json.dumps(base + urllib.parse.quote(tag, safe="") + ".json")},name:{json.dumps(tag)}}}'
+                    for tag in document.tags)
+                content = self.__configuration.staticFilesCache.resolveRewritten(
+                    targetFile,
+                    f'urls:{base}:{document.json.etag}',
+                    lambda buf: re.sub(rb'url:[^,]+,', lambda _: f'urls:[{urls}],'.encode(), buf, count=1))
+                # NOTE: the initializer changes whenever the set of tags does, so it must always be revalidated
+                cacheControl = 'no-cache'
+            elif self.__configuration.inlineSpec:
+                # embed "our" swagger.json in the initializer, saving the client a round trip
+                # NOTE: only the parts of the initializer either side of the document are cached, the document is written from the cached document
+                document = (await self.__resolveDocument()).json
+                initializer = self.__configuration.staticFilesCache.resolve(targetFile)
+                prefix = self.__configuration.staticFilesCache.resolveRewritten(
+                    targetFile,
+                    'spec:prefix',
+                    lambda buf: buf if _initializerUrlPattern.search(buf) is None else _initializerUrlPattern.split(buf, 1)[0] + b'spec:')
+                suffix = self.__configuration.staticFilesCache.resolveRewritten(
+                    targetFile,
+                    'spec:suffix',
+                    lambda buf: b',' + _initializerUrlPattern.split(buf, 1)[-1])
+                if initializer is not None and prefix is not None and suffix is not None and prefix.content[-5:] == b'spec:':
+                    await self.__writeInlined(initializer, prefix, document, suffix)
+                    return
+                # an initializer without a url is served as-is
+                content = initializer
+                cacheControl = self.__staticCacheControl()
+            else:
+                # rewrite initializer to fetch "our" swagger.json
+                swaggerJsonUrl = self.__swaggerJsonUrl
+                if self.__configuration.contentHashedUrls:
+                    swaggerJsonUrl = self.__hashedName(swaggerJsonUrl, (await self.__resolveDocument()).json)
+                if swaggerJsonUrl.startswith('./'):
+                    swaggerJsonUrl = '/' + originalPath.replace(targetFile, '') + swaggerJsonUrl.lstrip('.').lstrip('/')
+                content = self.__configuration.staticFilesCache.resolveRewritten(
+                    targetFile,
+                    swaggerJsonUrl,
+                    lambda buf: re.sub('url:[^,]+,', f'url:"{swaggerJsonUrl}",', buf.decode()).encode())
+                # NOTE: a content-hashed url changes whenever the document does, so the initializer must always be revalidated
+                cacheControl = 'no-cache' if self.__configuration.contentHashedUrls else self.__staticCacheControl()
+            if content is None:
                 raise tornado.web.HTTPError(404)
+            elif isinstance(content, StaticFile):
+                await self.__writeFile(content, cacheControl)
             else:
-                extension = path.split('.')[-1]
-                match extension:
-                    case 'css':
-                        self.set_header('Content-Type', 'text/css')
-                    case 'js':
-                        self.set_header('Content-Type', 'application/javascript')
-                    case 'html':
-                        self.set_header('Content-Type', 'text/html')
-                with open(path, 'rb') as file:
-                    buf = file.read()
-                    # rewrite initializer to fetch "our" swagger.json
-                    if path.endswith('swagger-initializer.js'):
-                        buf = buf.decode()
-                        swaggerJsonUrl = self.__swaggerJsonUrl
-                        if swaggerJsonUrl.startswith('./'):
-                            swaggerJsonUrl = '/' + originalPath.replace(targetFile, '') + swaggerJsonUrl.lstrip('.').lstrip('/')
-                        buf = re.sub('url:[^,]+,', f'url:"{swaggerJsonUrl}",', buf)
-                    self.write(buf)
-                    self.flush()
+                await self.__writeContent(content, cacheControl, acceptRanges=True)
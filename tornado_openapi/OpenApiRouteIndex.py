@@ -0,0 +1,223 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+import inspect
+import threading
+import tornado
+import tornado.routing
+import tornado.web
+from typing import Any
+import weakref
+
+from .MetaManager import MetaManager
+from .objects import Operation, Parameter, ParameterLocation, Schema
+from .PathTemplate import PathTemplate
+
+_instances = weakref.WeakKeyDictionary[tornado.web.Application,'OpenApiRouteIndex']()
+_instancesLock = threading.Lock()
+
+
+type OpenApiRouteIndex = OpenApiRouteIndex
+class OpenApiRouteIndex:
+    """
+    The operations found by walking the routing rules of a ``tornado.web.Application``, and interrogating the handlers they target.
+
+    There is one index per application, shared by every :py:class:`~tornado_openapi.OpenApiConfiguration` describing it, so that routes are walked (and handlers interrogated) once regardless of how many OAS documents are served. Operations are recorded with all of their tags, each configuration applies its own ``filter`` when building a document.
+
+    When decorator metadata changes only the rules targeting the affected handlers are converted again, see :py:meth:`~tornado_openapi.MetaManager.changedSince`. Metadata for handlers which are not (yet) routed does not affect the index at all, their rules are converted when added.
+    """
+
+    __application:weakref.ref[tornado.web.Application]
+    __generation:int
+    __lock:threading.Lock
+    __metaVersion:int
+    __operations:list[tuple[str,str,Operation,list[str],set[str]]]
+    __operationsByRule:dict[tornado.web.Rule,list[tuple[str,str,Operation,list[str],set[str]]]]
+    __rulesByTarget:dict[Any,set[tornado.web.Rule]]
+
+    def __init__(self, application:tornado.web.Application) -> None:
+        # NOTE: a weak reference, the index must not keep the application alive
+        self.__application = weakref.ref(application)
+        self.__generation = 0
+        self.__lock = threading.Lock()
+        self.__metaVersion = -1
+        self.__operations = list[tuple[str,str,Operation,list[str],set[str]]]()
+        self.__operationsByRule = dict[tornado.web.Rule,list[tuple[str,str,Operation,list[str],set[str]]]]()
+        self.__rulesByTarget = dict[Any,set[tornado.web.Rule]]()
+
+    @staticmethod
+    def forApplication(application:tornado.web.Application) -> OpenApiRouteIndex:
+        """Returns the index for ``application``, creating it if necessary."""
+        with _instancesLock:
+            result = _instances.get(application, None)
+            if result is None:
+                result = OpenApiRouteIndex(application)
+                _instances[application] = result
+            return result
+
+    def __getSchemaForParameter(self, parameter:inspect.Parameter) -> Schema:
+        # built-in types (str, int, float, etc)
+        schema = MetaManager.instance().getSchemaForType(parameter.annotation)
+        return schema
+    
+    def __tryParameterizePath(self, template:PathTemplate, positionalParameters:list[str], keywordParameters:list[str], parameters:list[Parameter]) -> tuple[bool, str]:
+        """
+        Tries to parameterize the path template for the provided parameter names, see ``PathTemplate.bind``.
+
+        :returns tuple[bool, str]: a tuple containing a bool indicating if parameters could be matched in the path string, and the resulting path string (whether or not parameters matched.)
+        """
+        wasSuccessful, result, queryStringParameters = template.bind(positionalParameters, keywordParameters)
+        if wasSuccessful:
+            # configure parameters as "querystring" parameters or "path" parameters
+            for p in parameters:
+                if p.location is None:
+                    p.location = ParameterLocation.QUERY if p.name in queryStringParameters else ParameterLocation.PATH
+        return (wasSuccessful, result)
+
+    def __convertRule(self, rule:tornado.web.Rule) -> list[tuple[str,str,Operation,list[str],set[str]]]:
+        result = list[tuple[str,str,Operation,list[str],set[str]]]()
+        if isinstance(rule.matcher, tornado.routing.PathMatches):
+            m:tornado.routing.PathMatches = rule.matcher
+            # NOTE: patterns are parsed once, and shared by every rule (and application) with the same pattern
+            template = PathTemplate.forPattern(m.regex.pattern)
+            if issubclass(rule.target, tornado.web.RequestHandler):
+                # the rule is converted again when metadata of the handler (or any of its actions) changes
+                self.__rulesByTarget.setdefault(rule.target, set[tornado.web.Rule]()).add(rule)
+                # NOTE: metadata for every action of the handler is resolved once, and shared by every rule targeting the handler
+                for actionName, metadata in MetaManager.instance().operationsFor(rule.target).items():
+                    self.__rulesByTarget.setdefault(metadata.action, set[tornado.web.Rule]()).add(rule)
+                    operation = Operation()
+                    # tags
+                    tags = metadata.tags
+                    # parameters (args and kwargs)
+                    parameters = list[Parameter]()
+                    positionalParameterNames = []
+                    keywordParameterNames = []
+                    signature = metadata.signature
+                    for v in signature.parameters.values():
+                        if v.name == 'self' or v.name == 'cls':
+                            continue
+                        parameter = Parameter()
+                        parameter.name = v.name
+                        parameter.schema
+                        schema = self.__getSchemaForParameter(v)
+                        if schema is not None:
+                            parameter.schema = schema
+                            # TODO: support `parameter.style` ?
+                        match v.kind:
+                            case inspect._ParameterKind.KEYWORD_ONLY:
+                                keywordParameterNames.append(parameter.name)
+                            case inspect._ParameterKind.POSITIONAL_OR_KEYWORD:
+                                positionalParameterNames.append(parameter.name)
+                                keywordParameterNames.append(parameter.name)
+                            case inspect._ParameterKind.POSITIONAL_ONLY:
+                                positionalParameterNames.append(parameter.name)
+                        parameters.append(parameter)
+
+                    # parameters (headers)
+                    headers = metadata.headers
+                    if headers is not None:
+                        for header in headers.values():
+                            parameters.append(header)
+
+                    # parameters (cookies)
+                    cookies = metadata.cookies
+                    if cookies is not None:
+                        for cookie in cookies.values():
+                            parameters.append(cookie)
+
+                    if len(parameters) > 0:
+                        operation.parameters = parameters
+
+                    if len(positionalParameterNames) > 0 or len(keywordParameterNames) > 0:
+                        # there are params, require matching function to successfully match them all
+                        pathMatched, parameterizedPath = self.__tryParameterizePath(template, positionalParameterNames, keywordParameterNames, parameters)
+                    elif not template.hasCaptures and (len(signature.parameters) == 0 or (len(signature.parameters) == 1 and signature.parameters.get('self', None) is not None)):
+                        # there were no params, pseudo a match success (params are not required for an enpoint to invoke)
+                        pathMatched = True
+                        parameterizedPath = template.bind([], [])[1]
+                    else:
+                        # in this branch the endpoint path contained params, but no params were extracted. this should never happen, but for completeness we pseudo a match failure
+                        pathMatched = False
+                        parameterizedPath = template.pattern
+
+                    # request bodies
+                    operation.requestBody = metadata.requestBody
+                    # if operation.requestBody is not None:
+                    #     self.__logger.debug(f'no requestBody for {action} on {rule.target.__name__}')
+
+                    # response(s)
+                    operation.responses = metadata.responses
+
+                    if pathMatched and tags is not None and len(tags) > 0:
+                        requiredSchemas = set[str]()
+                        # update required schemas (request bodies)
+                        if operation.requestBody is not None:
+                            for k,v in operation.requestBody.content.items():
+                                schemaRef = v.schema.get('$ref', None)
+                                if schemaRef is not None:
+                                    requiredSchemas.add(schemaRef)
+                        # update required schemas (parameters)
+                        if operation.parameters is not None:
+                            for p in operation.parameters:
+                                schemaRef = p.get('$ref', None)
+                                if schemaRef is not None:
+                                    requiredSchemas.add(schemaRef)
+                        # update required schemas (responses)
+                        if operation.responses is not None:
+                            for code,r in operation.responses.asDictionary().items():
+                                if r.get('content', None) is not None:
+                                    for k,v in r['content'].items():
+                                        s = v.get('schema', None)
+                                        schemaRef = None if s is None else s.get('$ref', None)
+                                        if schemaRef is not None:
+                                            requiredSchemas.add(schemaRef)
+                        # security requirements
+                        if metadata.security is not None:
+                            operation.security = metadata.security
+                        result.append((parameterizedPath, actionName, operation, tags, requiredSchemas))
+        return result
+
+    def __iterateRules(self, rules:list[tornado.web.Rule]) -> None:
+        for rule in rules:
+            # only rules which have not been seen by a prior scan are converted, their operations are already recorded
+            if rule not in self.__operationsByRule:
+                operations = self.__convertRule(rule)
+                self.__operationsByRule[rule] = operations
+                self.__operations.extend(operations)
+            if isinstance(rule.target, tornado.web._ApplicationRouter):
+                router:tornado.web._ApplicationRouter = rule.target
+                self.__iterateRules(router.rules)
+
+    def scan(self) -> tuple[int,list[tuple[str,str,Operation,list[str],set[str]]]]:
+        """
+        Converts any rules added since the prior scan, and returns all recorded operations.
+
+        When decorator metadata of a routed handler has changed since the prior scan the rules targeting it are converted again, and the generation is incremented. Operations recorded by a prior scan are only appended to (never modified) within a generation, so callers can convert only those operations they have not seen before.
+
+        :returns tuple: The generation, and a list of ``(path, method, operation, tags, requiredSchemas)`` tuples. The list, and the operations within it, must not be modified.
+        """
+        with self.__lock:
+            changedTargets = MetaManager.instance().changedSince(self.__metaVersion)
+            if changedTargets is None:
+                # all metadata was invalidated, start over
+                self.__generation += 1
+                self.__operations = list[tuple[str,str,Operation,list[str],set[str]]]()
+                self.__operationsByRule = dict[tornado.web.Rule,list[tuple[str,str,Operation,list[str],set[str]]]]()
+                self.__rulesByTarget = dict[Any,set[tornado.web.Rule]]()
+            else:
+                changedRules = set[tornado.web.Rule]()
+                for target in changedTargets:
+                    changedRules.update(self.__rulesByTarget.get(target, ()))
+                if len(changedRules) > 0:
+                    # only the affected rules are converted again, operations of all other rules are kept (in rule order)
+                    self.__generation += 1
+                    for rule in changedRules:
+                        self.__operationsByRule[rule] = self.__convertRule(rule)
+                    self.__operations = [e for operations in self.__operationsByRule.values() for e in operations]
+            application = self.__application()
+            if application is not None:
+                self.__iterateRules(application.default_router.rules)
+            # NOTE: captured after converting, schema resolution may register new schemas
+            self.__metaVersion = MetaManager.instance().version
+            return (self.__generation, self.__operations)
@@ -0,0 +1,91 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+import inspect
+from typing import Callable
+
+from .objects.Parameter import Parameter
+from .objects.Responses import Responses
+from .objects.RequestBody import RequestBody
+from .objects.SecurityRequirement import SecurityRequirement
+
+
+class OperationMetadata:
+    """
+    All decorator metadata for one request method of a ``RequestHandler``, resolved once, see :py:meth:`~tornado_openapi.MetaManager.operationFor`.
+
+    Instances are treated as immutable, they are replaced (not modified) when metadata changes.
+    """
+
+    __action:Callable
+    __cookies:dict[str,Parameter]|None
+    __handler:type
+    __headers:dict[str,Parameter]|None
+    __method:str
+    __requestBody:RequestBody|None
+    __responses:Responses|None
+    __security:list[SecurityRequirement]|None
+    __signature:inspect.Signature
+    __tags:list[str]
+
+    def __init__(self, handler:type, method:str, action:Callable, tags:list[str], headers:dict[str,Parameter]|None, cookies:dict[str,Parameter]|None, requestBody:RequestBody|None, responses:Responses|None, security:list[SecurityRequirement]|None) -> None:
+        self.__action = action
+        self.__cookies = cookies
+        self.__handler = handler
+        self.__headers = headers
+        self.__method = method
+        self.__requestBody = requestBody
+        self.__responses = responses
+        self.__security = security
+        self.__signature = inspect.signature(action)
+        self.__tags = tags
+
+    @property
+    def action(self) -> Callable:
+        """The request method, unwrapped from any decorators."""
+        return self.__action
+
+    @property
+    def cookies(self) -> dict[str,Parameter]|None:
+        """The cookie parameters of the operation, keyed by name, if any."""
+        return self.__cookies
+
+    @property
+    def handler(self) -> type:
+        """The ``RequestHandler`` class."""
+        return self.__handler
+
+    @property
+    def headers(self) -> dict[str,Parameter]|None:
+        """The header parameters of the operation, keyed by name, if any."""
+        return self.__headers
+
+    @property
+    def method(self) -> str:
+        """The (lower case) name of the request method, such as ``'get'``."""
+        return self.__method
+
+    @property
+    def requestBody(self) -> RequestBody|None:
+        """The request body of the operation, if any."""
+        return self.__requestBody
+
+    @property
+    def responses(self) -> Responses|None:
+        """The responses of the operation, if any."""
+        return self.__responses
+
+    @property
+    def security(self) -> list[SecurityRequirement]|None:
+        """The security requirements of the operation, falling back to those of the ``RequestHandler`` class, if any."""
+        return self.__security
+
+    @property
+    def signature(self) -> inspect.Signature:
+        """The signature of the (unwrapped) request method."""
+        return self.__signature
+
+    @property
+    def tags(self) -> list[str]:
+        """The tags of the ``RequestHandler`` class, followed by the tags of the request method."""
+        return self.__tags
@@ -0,0 +1,231 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+from re import _constants as _sre
+from re import _parser
+import threading
+
+_templates = dict[str,'PathTemplate']()
+_templatesLock = threading.Lock()
+
+_categories = {
+    _sre.CATEGORY_DIGIT: r'\d',
+    _sre.CATEGORY_NOT_DIGIT: r'\D',
+    _sre.CATEGORY_SPACE: r'\s',
+    _sre.CATEGORY_NOT_SPACE: r'\S',
+    _sre.CATEGORY_WORD: r'\w',
+    _sre.CATEGORY_NOT_WORD: r'\W'
+}
+# characters which must be escaped to appear literally in regex text, outside of a character set
+_specialCharacters = frozenset('.^$*+?{}[]\\|()')
+
+
+def _unparseCharacter(value:int) -> str:
+    c = chr(value)
+    return '\\' + c if c in _specialCharacters else c
+
+
+def _unparse(items:list[tuple]) -> str:
+    """
+    Reconstructs regex text for a parsed (sub)pattern, used for those parts of a path which cannot be rendered as literal text (such as ``.*``.)
+    """
+    result = list[str]()
+    for op, av in items:
+        match op:
+            case _sre.LITERAL:
+                result.append(_unparseCharacter(av))
+            case _sre.NOT_LITERAL:
+                result.append(f'[^{_unparseCharacter(av)}]')
+            case _sre.ANY:
+                result.append('.')
+            case _sre.CATEGORY:
+                result.append(_categories.get(av, ''))
+            case _sre.IN:
+                members = list[str]()
+                for memberOp, memberAv in av:
+                    match memberOp:
+                        case _sre.NEGATE:
+                            members.append('^')
+                        case _sre.LITERAL:
+                            members.append(_unparseCharacter(memberAv))
+                        case _sre.RANGE:
+                            members.append(f'{_unparseCharacter(memberAv[0])}-{_unparseCharacter(memberAv[1])}')
+                        case _sre.CATEGORY:
+                            members.append(_categories.get(memberAv, ''))
+                result.append('[' + ''.join(members) + ']')
+            case _sre.MAX_REPEAT | _sre.MIN_REPEAT | _sre.POSSESSIVE_REPEAT:
+                lower, upper, item = av
+                if (lower, upper) == (0, _sre.MAXREPEAT):
+                    quantifier = '*'
+                elif (lower, upper) == (1, _sre.MAXREPEAT):
+                    quantifier = '+'
+                elif (lower, upper) == (0, 1):
+                    quantifier = '?'
+                elif upper == _sre.MAXREPEAT:
+                    quantifier = f'{{{lower},}}'
+                elif lower == upper:
+                    quantifier = f'{{{lower}}}'
+                else:
+                    quantifier = f'{{{lower},{upper}}}'
+                if op == _sre.MIN_REPEAT:
+                    quantifier += '?'
+                elif op == _sre.POSSESSIVE_REPEAT:
+                    quantifier += '+'
+                text = _unparse(item)
+                result.append(text + quantifier if len(item) == 1 and item[0][0] != _sre.BRANCH else f'(?:{text}){quantifier}')
+            case _sre.SUBPATTERN:
+                group, _, _, item = av
+                result.append(('(' if group is not None else '(?:') + _unparse(item) + ')')
+            case _sre.BRANCH:
+                result.append('(?:' + '|'.join(_unparse(e) for e in av[1]) + ')')
+            case _sre.AT:
+                if av == _sre.AT_BEGINNING:
+                    result.append('^')
+                elif av == _sre.AT_END:
+                    result.append('$')
+    return ''.join(result)
+
+
+type PathTemplate = PathTemplate
+class PathTemplate:
+    """
+    A path regex (such as ``PathMatches.regex``) parsed into literal text and capture "slots", which can then be rendered as an OAS path template such as ``'/api/v2/users/{id}'``.
+
+    Patterns are parsed once, using the stdlib regex parser, see :py:meth:`forPattern`. Unlike matching the pattern text with other regexes this is correct for nested groups, alternations and escaped parentheses.
+
+    A ``?`` which makes the preceding element optional (such as ``(?P<id>\\d+)?name=...``) is rendered as the querystring delimiter, as it would be when reversing the url, captures after it which are preceded by ``name=`` are querystring parameters.
+    """
+
+    __groupNames:dict[int,str]
+    __nestedGroups:list[int]
+    __parts:list[str|int]
+    __pattern:str
+    __queryGroups:set[int]
+    __slots:list[int]
+
+    def __init__(self, pattern:str) -> None:
+        """
+        :param str pattern: The path regex.
+        """
+        self.__pattern = pattern
+        self.__parts = list[str|int]()
+        self.__slots = list[int]()
+        self.__nestedGroups = list[int]()
+        self.__queryGroups = set[int]()
+        parsed = _parser.parse(pattern)
+        self.__groupNames = { v:k for k,v in parsed.state.groupdict.items() }
+        self.__render(list(parsed), False)
+
+    @staticmethod
+    def forPattern(pattern:str) -> PathTemplate:
+        """Returns the template for ``pattern``, parsing it only if it has not been parsed before."""
+        result = _templates.get(pattern, None)
+        if result is None:
+            with _templatesLock:
+                result = _templates.get(pattern, None)
+                if result is None:
+                    result = PathTemplate(pattern)
+                    _templates[pattern] = result
+        return result
+
+    @property
+    def hasCaptures(self) -> bool:
+        """``True`` if the pattern contains any capturing groups."""
+        return len(self.__slots) > 0 or len(self.__nestedGroups) > 0
+
+    @property
+    def pattern(self) -> str:
+        """The path regex the template was parsed from."""
+        return self.__pattern
+
+    def __appendText(self, text:str) -> None:
+        if len(self.__parts) > 0 and isinstance(self.__parts[-1], str):
+            self.__parts[-1] += text
+        else:
+            self.__parts.append(text)
+
+    def __collectNestedGroups(self, items:list[tuple]) -> None:
+        for op, av in items:
+            match op:
+                case _sre.SUBPATTERN:
+                    if av[0] is not None:
+                        self.__nestedGroups.append(av[0])
+                    self.__collectNestedGroups(av[3])
+                case _sre.MAX_REPEAT | _sre.MIN_REPEAT | _sre.POSSESSIVE_REPEAT:
+                    self.__collectNestedGroups(av[2])
+                case _sre.BRANCH:
+                    for e in av[1]:
+                        self.__collectNestedGroups(e)
+                case _sre.ASSERT | _sre.ASSERT_NOT:
+                    self.__collectNestedGroups(av[1])
+
+    def __render(self, items:list[tuple], inQuery:bool) -> bool:
+        """Renders ``items`` into parts and slots, returns ``True`` once the querystring delimiter has been rendered."""
+        for i, (op, av) in enumerate(items):
+            match op:
+                case _sre.LITERAL:
+                    c = chr(av)
+                    self.__appendText(c)
+                    if c == '?':
+                        inQuery = True
+                case _sre.SUBPATTERN if av[0] is not None:
+                    # a capture, anything it contains is matched by the parameter it is bound to
+                    group = av[0]
+                    self.__parts.append(group)
+                    self.__slots.append(group)
+                    if inQuery:
+                        name = self.__groupNames.get(group, None)
+                        preceding = self.__parts[-2] if len(self.__parts) > 1 and isinstance(self.__parts[-2], str) else ''
+                        if name is not None and preceding.endswith(f'{name}='):
+                            self.__queryGroups.add(group)
+                    self.__collectNestedGroups(av[3])
+                case _sre.SUBPATTERN:
+                    inQuery = self.__render(av[3], inQuery)
+                case (_sre.MAX_REPEAT | _sre.MIN_REPEAT) if av[0] == 0 and av[1] == 1:
+                    # an optional element, a trailing `?` (such as `/items/?`) only makes the element optional
+                    inQuery = self.__render(av[2], inQuery)
+                    if any(e[0] != _sre.AT for e in items[i+1:]):
+                        self.__appendText('?')
+                        inQuery = True
+                case _sre.AT:
+                    # anchors (`^` and `$`) do not appear in the path
+                    pass
+                case _:
+                    self.__appendText(_unparse([(op, av)]))
+                    self.__collectNestedGroups([(op, av)])
+        return inQuery
+
+    def bind(self, positionalParameters:list[str], keywordParameters:list[str]) -> tuple[bool,str,set[str]]:
+        """
+        Binds parameter names to the captures of the template, named captures by name and unnamed captures by position, and renders the path.
+
+        :param list[str] positionalParameters: The names of parameters which can be passed by position, in order.
+        :param list[str] keywordParameters: The names of parameters which can be passed by name.
+        :returns tuple[bool, str, set[str]]: a tuple containing a bool indicating if every parameter was bound to a capture (and every capture to a parameter), the resulting path string (whether or not parameters matched), and the names of parameters bound within the querystring.
+
+        ---
+        NOTE: Currently, Tornado enforces that all regex captures in a path are either all "named", or all "unnamed", but does not allow a mixture of named and unnamed. This method, however, supports a mixture of named and unnamed.
+        """
+        positional = list(positionalParameters)
+        keyword = list(keywordParameters)
+        bound = dict[int,str]()
+        # named captures are mapped to kwargs by tornado, nested captures are bound but not rendered (their parent capture is)
+        for group in self.__slots + self.__nestedGroups:
+            name = self.__groupNames.get(group, None)
+            if name is not None and name in keyword:
+                bound[group] = name
+                keyword.remove(name)
+                if name in positional:
+                    positional.remove(name)
+        # unnamed captures must be matched by position (aka positional args)
+        for group in self.__slots:
+            if group not in bound and group not in self.__groupNames and len(positional) > 0:
+                name = positional.pop(0)
+                bound[group] = name
+                if name in keyword:
+                    keyword.remove(name)
+        wasSuccessful = len(positional) == 0 and len(keyword) == 0 and all(group in bound for group in self.__slots)
+        path = ''.join(
+            e if isinstance(e, str) else f'{{{bound.get(e, self.__groupNames.get(e, e))}}}'
+            for e in self.__parts)
+        return (wasSuccessful, path, { bound[group] for group in self.__queryGroups if group in bound })
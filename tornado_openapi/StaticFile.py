@@ -0,0 +1,57 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+import datetime
+import os
+
+
+class StaticFile:
+    """
+    A static file which is too large to hold in memory, and is instead streamed from disk on each request.
+
+    Unlike ``CachedContent`` the ETag is derived from the modification time and size of the file, so that the file does not need to be read in full to produce it.
+    """
+
+    __contentType:str
+    __etag:str
+    __lastModified:datetime.datetime
+    __path:str
+    __size:int
+
+    def __init__(self, path:str, contentType:str, fileStat:os.stat_result) -> None:
+        """
+        :param str path: The path of the file.
+        :param str contentType: The value for the ``Content-Type`` header.
+        :param stat_result fileStat: The result of ``os.stat`` for the file.
+        """
+        self.__contentType = contentType
+        self.__etag = f'"{fileStat.st_mtime_ns:x}-{fileStat.st_size:x}"'
+        # NOTE: HTTP dates have a resolution of one second
+        self.__lastModified = datetime.datetime.fromtimestamp(int(fileStat.st_mtime), datetime.timezone.utc)
+        self.__path = path
+        self.__size = fileStat.st_size
+
+    @property
+    def contentType(self) -> str:
+        """The value for the ``Content-Type`` header."""
+        return self.__contentType
+
+    @property
+    def etag(self) -> str:
+        """An ETag (including quotes) derived from the modification time and size of the file."""
+        return self.__etag
+
+    @property
+    def lastModified(self) -> datetime.datetime:
+        """The modification time of the file, used for the ``Last-Modified`` header."""
+        return self.__lastModified
+
+    @property
+    def path(self) -> str:
+        """The path of the file."""
+        return self.__path
+
+    @property
+    def size(self) -> int:
+        """The size of the file, in bytes."""
+        return self.__size
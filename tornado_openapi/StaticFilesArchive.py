@@ -0,0 +1,119 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+import datetime
+import mmap
+import os
+import struct
+import zipfile
+import zlib
+
+# the fixed-size portion of a zip local file header, see APPNOTE.TXT section 4.3.7
+_localHeader = struct.Struct('<4s2B4HL2L2H')
+_localHeaderSignature = b'PK\003\004'
+# a gzip member header with no optional fields, no timestamp and "unknown" OS, see RFC 1952
+_gzipHeader = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+
+
+type StaticFilesArchive = StaticFilesArchive
+class StaticFilesArchive:
+    """
+    Serves ``swagger-ui`` static files out of a zip file (such as a wheel, or a zipapp) without extracting them.
+
+    The archive is indexed once, when opened, and is read through a read-only memory map, so each member is read with a single slice. Members stored with ``deflate`` compression can also be read as ``gzip`` without being decompressed, see :py:meth:`readGzip`.
+
+    Only members directly within ``prefix`` are served, matching how static files are served from a directory.
+    """
+
+    __buffer:mmap.mmap
+    __index:dict[str,tuple[int,int,int,int,int,datetime.datetime]]
+    __path:str
+
+    def __init__(self, path:str, prefix:str = '') -> None:
+        """
+        :param str path: The path of the zip file.
+        :param str prefix: The directory within the zip file holding the static files, such as ``'swagger-ui'``.
+        """
+        self.__path = path
+        self.__index = dict[str,tuple[int,int,int,int,int,datetime.datetime]]()
+        prefix = prefix.strip('/')
+        prefix = '' if len(prefix) == 0 else prefix + '/'
+        with open(path, 'rb') as file:
+            # NOTE: the mapping remains valid after the file is closed
+            self.__buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.startswith(prefix):
+                    continue
+                name = info.filename[len(prefix):]
+                if '/' in name:
+                    continue
+                if info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) or info.flag_bits & 0x1:
+                    # NOTE: other compression methods (and encryption) are left to `zipfile`
+                    continue
+                # the central directory records where the local header is, the data follows the (variable length) local header
+                header = _localHeader.unpack_from(self.__buffer, info.header_offset)
+                if header[0] != _localHeaderSignature:
+                    raise zipfile.BadZipFile(f'Bad local file header for {info.filename!r} in {path!r}')
+                offset = info.header_offset + _localHeader.size + header[10] + header[11]
+                lastModified = datetime.datetime(*info.date_time, tzinfo=datetime.timezone.utc)
+                self.__index[name] = (offset, info.compress_size, info.file_size, info.CRC, info.compress_type, lastModified)
+
+    def __contains__(self, name:str) -> bool:
+        return name in self.__index
+
+    @staticmethod
+    def open(path:str) -> StaticFilesArchive|None:
+        """
+        Opens the archive holding ``path``, where ``path`` is a zip file or a directory within one (such as ``'./app.pyz/swagger-ui'``.) Returns ``None`` if ``path`` is not within a zip file.
+        """
+        path = os.path.abspath(path)
+        archivePath = path
+        while not os.path.exists(archivePath):
+            parent = os.path.dirname(archivePath)
+            if parent == archivePath:
+                return None
+            archivePath = parent
+        if not os.path.isfile(archivePath) or not zipfile.is_zipfile(archivePath):
+            return None
+        prefix = os.path.relpath(path, archivePath).replace(os.sep, '/')
+        return StaticFilesArchive(archivePath, '' if prefix == '.' else prefix)
+
+    @property
+    def names(self) -> list[str]:
+        """The names of all files served from the archive."""
+        return list(self.__index.keys())
+
+    @property
+    def path(self) -> str:
+        """The path of the zip file."""
+        return self.__path
+
+    def close(self) -> None:
+        """Releases the memory map of the zip file."""
+        self.__buffer.close()
+
+    def lastModified(self, name:str) -> datetime.datetime:
+        """Returns the modification time recorded in the archive for ``name``."""
+        return self.__index[name][5]
+
+    def read(self, name:str) -> bytes:
+        """Reads and (if necessary) decompresses the member ``name``."""
+        offset, compressedSize, size, crc, compressType, _ = self.__index[name]
+        data = self.__buffer[offset:offset+compressedSize]
+        if compressType == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(data, -zlib.MAX_WBITS, size)
+        if zlib.crc32(data) != crc:
+            raise zipfile.BadZipFile(f'Bad CRC-32 for {name!r} in {self.__path!r}')
+        return data
+
+    def readGzip(self, name:str) -> bytes|None:
+        """
+        Reads the member ``name`` as a ``gzip`` stream, without decompressing it. Returns ``None`` if the member is not ``deflate`` compressed.
+
+        Zip and ``gzip`` both hold raw ``deflate`` data, and both record the CRC-32 and size of the uncompressed data, so the stored member only needs a ``gzip`` header and trailer added to it.
+        """
+        offset, compressedSize, size, crc, compressType, _ = self.__index[name]
+        if compressType != zipfile.ZIP_DEFLATED:
+            return None
+        return _gzipHeader + self.__buffer[offset:offset+compressedSize] + struct.pack('<2L', crc, size & 0xffffffff)
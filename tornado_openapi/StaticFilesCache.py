@@ -0,0 +1,238 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+from collections import OrderedDict
+import datetime
+import mimetypes
+import os
+import stat
+from typing import Callable, ForwardRef
+
+from .CachedContent import CachedContent
+from .StaticFile import StaticFile
+from .StaticFilesArchive import StaticFilesArchive
+
+OpenApiConfiguration = ForwardRef('OpenApiConfiguration')
+
+_maxRewrites = 16
+
+_contentTypes = {
+    'css': 'text/css',
+    'html': 'text/html',
+    'js': 'application/javascript'
+}
+
+
+class StaticFilesCache:
+    """
+    A bounded, in-memory cache of ``swagger-ui`` static files for an :py:class:`~tornado_openapi.OpenApiConfiguration`, keyed by file name.
+
+    When :py:attr:`~tornado_openapi.OpenApiConfiguration.staticFilesPath` refers to a zip file, or a directory within one, files are served directly from the zip file without being extracted.
+
+    Cached files are revalidated against the modification time and size of the file on disk, unless :py:attr:`~tornado_openapi.OpenApiConfiguration.staticFilesRevalidate` is ``False``, in which case a cached file is served without touching the filesystem at all. When the total size of cached files exceeds :py:attr:`~tornado_openapi.OpenApiConfiguration.staticFilesCacheSize` the least recently used files are evicted.
+    """
+
+    __archive:tuple[str,StaticFilesArchive|None]|None
+    __configuration:OpenApiConfiguration
+    __encodedInlined:tuple[str,dict[str,bytes]]|None
+    __entries:OrderedDict[str,tuple[CachedContent,int,int]]
+    __rewrites:OrderedDict[tuple[str,str],tuple[CachedContent,CachedContent]]
+    __size:int
+
+    def __init__(self, configuration:OpenApiConfiguration) -> None:
+        self.__archive = None
+        self.__configuration = configuration
+        self.__encodedInlined = None
+        self.__entries = OrderedDict[str,tuple[CachedContent,int,int]]()
+        self.__rewrites = OrderedDict[tuple[str,str],tuple[CachedContent,CachedContent]]()
+        self.__size = 0
+
+    @property
+    def size(self) -> int:
+        """The total number of bytes currently cached, including encoded variants."""
+        return self.__size
+
+    def __contains__(self, name:str) -> bool:
+        return name in self.__entries
+
+    def __resolveArchive(self) -> StaticFilesArchive|None:
+        # NOTE: the archive is indexed once, and again only if `staticFilesPath` is changed
+        path = self.__configuration.staticFilesPath
+        if self.__archive is None or self.__archive[0] != path:
+            if self.__archive is not None and self.__archive[1] is not None:
+                self.__archive[1].close()
+            self.__archive = (path, None if os.path.isdir(path) else StaticFilesArchive.open(path))
+        return self.__archive[1]
+
+    def __loadFromArchive(self, archive:StaticFilesArchive, name:str) -> CachedContent|None:
+        if name not in archive:
+            return None
+        encoded = dict[str,bytes]()
+        if 'gzip' in self.__configuration.encoders:
+            gzipped = archive.readGzip(name)
+            if gzipped is not None:
+                encoded['gzip'] = gzipped
+        content = CachedContent(
+            archive.read(name),
+            StaticFilesCache.contentTypeFor(name),
+            self.__configuration.encoders,
+            encoded,
+            archive.lastModified(name))
+        self.__store(name, content, 0, 0)
+        return content
+
+    def __store(self, name:str, content:CachedContent, mtime:int, size:int) -> None:
+        capacity = self.__configuration.staticFilesCacheSize
+        if capacity is None or len(content.content) <= capacity:
+            self.__entries[name] = (content, mtime, size)
+            self.__size += StaticFilesCache.__sizeOf(content)
+            while capacity is not None and self.__size > capacity:
+                # least recently used first
+                self.__evict(next(iter(self.__entries)))
+
+    def __evict(self, name:str) -> None:
+        entry = self.__entries.pop(name, None)
+        if entry is not None:
+            self.__size -= StaticFilesCache.__sizeOf(entry[0])
+
+    def __pathFor(self, name:str) -> str:
+        return os.path.join(os.path.abspath(self.__configuration.staticFilesPath), name)
+
+    def __readFile(self, path:str) -> bytes:
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def __readSiblings(self, path:str, fileStat:os.stat_result) -> dict[str,bytes]:
+        """
+        Reads pre-encoded sibling files (such as ``swagger-ui-bundle.js.gz``) for each configured encoder, these are served in preference to encoding on load.
+        """
+        result = dict[str,bytes]()
+        for encoding in self.__configuration.encoders.keys():
+            siblingPath = path + CachedContent.extensionFor(encoding)
+            try:
+                siblingStat = os.stat(siblingPath)
+            except OSError:
+                continue
+            # a sibling older than the file it was encoded from is presumed stale
+            if stat.S_ISREG(siblingStat.st_mode) and siblingStat.st_mtime_ns >= fileStat.st_mtime_ns:
+                result[encoding] = self.__readFile(siblingPath)
+        return result
+
+    @staticmethod
+    def __sizeOf(content:CachedContent) -> int:
+        return len(content.content) + sum(len(e) for e in content.encodings.values())
+
+    @staticmethod
+    def contentTypeFor(name:str) -> str:
+        """Returns the ``Content-Type`` to serve a static file with, based on its file extension."""
+        contentType = _contentTypes.get(name.split('.')[-1], None)
+        if contentType is None:
+            contentType = mimetypes.guess_type(name)[0]
+        return 'application/octet-stream' if contentType is None else contentType
+
+    def clear(self) -> None:
+        """Discards all cached files."""
+        self.__encodedInlined = None
+        self.__entries.clear()
+        self.__rewrites.clear()
+        self.__size = 0
+
+    def encodedInlined(self, etag:str, encoding:str) -> bytes|None:
+        """Returns the encoded variant of the initializer with the OAS document embedded in it (see :py:attr:`~tornado_openapi.OpenApiConfiguration.inlineSpec`) stored for ``etag``, if any."""
+        if self.__encodedInlined is None or self.__encodedInlined[0] != etag:
+            return None
+        return self.__encodedInlined[1].get(encoding, None)
+
+    def storeEncodedInlined(self, etag:str, encoding:str, content:bytes) -> None:
+        """Stores an encoded variant of the initializer with the OAS document embedded in it. Only variants for the most recent ``etag`` are kept, storing a variant for a new ``etag`` discards all others."""
+        if self.__encodedInlined is None or self.__encodedInlined[0] != etag:
+            self.__encodedInlined = (etag, dict[str,bytes]())
+        self.__encodedInlined[1][encoding] = content
+
+    def preload(self) -> int:
+        """
+        Loads every file found in :py:attr:`~tornado_openapi.OpenApiConfiguration.staticFilesPath` (or the zip file it refers to) into the cache, for as long as they fit.
+
+        :returns int: The number of files cached.
+        """
+        archive = self.__resolveArchive()
+        path = os.path.abspath(self.__configuration.staticFilesPath)
+        if archive is not None:
+            names = set(archive.names)
+        elif os.path.isdir(path):
+            names = set(os.listdir(path))
+        else:
+            return 0
+        siblingExtensions = [CachedContent.extensionFor(encoding) for encoding in self.__configuration.encoders.keys()]
+        for name in sorted(names):
+            if any(name.endswith(e) and name[:-len(e)] in names for e in siblingExtensions):
+                # pre-encoded siblings are loaded along with the file they were encoded from
+                continue
+            self.resolve(name)
+        return len(self.__entries)
+
+    def resolve(self, name:str) -> CachedContent|StaticFile|None:
+        """
+        Returns the content of the static file ``name``, loading it from disk if it is not cached or has changed since it was cached. Returns ``None`` if no such file exists.
+
+        Files are pre-encoded once, on load, using :py:attr:`~tornado_openapi.OpenApiConfiguration.encoders`. Where a sibling file already holds an encoded variant (such as ``swagger-ui-bundle.js.gz``) it is used instead.
+
+        Files larger than :py:attr:`~tornado_openapi.OpenApiConfiguration.staticFilesCacheSize` are not read at all, a ``StaticFile`` is returned instead so that the file can be streamed from disk. Members of a zip file are always loaded, they are already memory mapped.
+        """
+        archive = self.__resolveArchive()
+        entry = self.__entries.get(name, None)
+        if entry is not None and (archive is not None or not self.__configuration.staticFilesRevalidate):
+            # NOTE: archives are never revalidated, their contents cannot change without a restart
+            self.__entries.move_to_end(name)
+            return entry[0]
+        if archive is not None:
+            return self.__loadFromArchive(archive, name)
+        path = self.__pathFor(name)
+        try:
+            fileStat = os.stat(path)
+        except OSError:
+            self.__evict(name)
+            return None
+        if not stat.S_ISREG(fileStat.st_mode):
+            self.__evict(name)
+            return None
+        if entry is not None and entry[1] == fileStat.st_mtime_ns and entry[2] == fileStat.st_size:
+            self.__entries.move_to_end(name)
+            return entry[0]
+        self.__evict(name)
+        capacity = self.__configuration.staticFilesCacheSize
+        if capacity is not None and fileStat.st_size > capacity:
+            # too large to hold in memory, the file is streamed from disk instead
+            return StaticFile(path, StaticFilesCache.contentTypeFor(name), fileStat)
+        content = CachedContent(
+            self.__readFile(path),
+            StaticFilesCache.contentTypeFor(name),
+            self.__configuration.encoders,
+            self.__readSiblings(path, fileStat),
+            # NOTE: HTTP dates have a resolution of one second
+            datetime.datetime.fromtimestamp(int(fileStat.st_mtime), datetime.timezone.utc))
+        self.__store(name, content, fileStat.st_mtime_ns, fileStat.st_size)
+        return content
+
+    def resolveRewritten(self, name:str, key:str, rewrite:Callable[[bytes],bytes]) -> CachedContent|None:
+        """
+        Returns the content of the static file ``name`` after applying ``rewrite`` to it, such as the ``swagger-ui`` initializer pointing at a particular OAS document url. Returns ``None`` if no such file exists.
+
+        The rewritten content is cached (and encoded) once per distinct ``key``, and is rewritten again only if the file itself changes. ``key`` must identify everything ``rewrite`` depends on.
+        """
+        source = self.resolve(name)
+        if source is None:
+            return None
+        elif isinstance(source, StaticFile):
+            return CachedContent(rewrite(self.__readFile(source.path)), source.contentType)
+        entry = self.__rewrites.get((name,key), None)
+        if entry is not None and entry[0] is source:
+            self.__rewrites.move_to_end((name,key))
+            return entry[1]
+        encoders = self.__configuration.encoders if name in self.__entries else None
+        content = CachedContent(rewrite(source.content), source.contentType, encoders)
+        self.__rewrites[(name,key)] = (source, content)
+        while len(self.__rewrites) > _maxRewrites:
+            # least recently used first
+            self.__rewrites.popitem(last=False)
+        return content
@@ -1,18 +1,24 @@
 # SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
 # SPDX-License-Identifier: MIT
 
+from .CachedContent import CachedContent
 from .MetaManager import MetaManager
 from .OpenApiHandler import OpenApiHandler
 from .decorators import api, cookie, header, request, response, anonymous, apiKey, httpBasic, bearerToken, mutualTLS, oauth2, openId
 from .OpenApiConfiguration import OpenApiConfiguration
 from .OpenApiConfigurator import OpenApiConfigurator
+from .OpenApiDocument import OpenApiDocument
+from .OperationMetadata import OperationMetadata
 from . import decorators, objects
 
 __all__ = [
+    'CachedContent',
     'MetaManager',
     'OpenApiConfiguration',
     'OpenApiConfigurator',
+    'OpenApiDocument',
     'OpenApiHandler',
+    'OperationMetadata',
     'api', 'cookie', 'header', 'request', 'response', 'anonymous', 'apiKey', 'httpBasic', 'bearerToken', 'mutualTLS', 'oauth2', 'openId',
     'decorators', 'objects'
 ]
@@ -0,0 +1,128 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+#
+# Command-line entry point, allowing OAS documents to be generated at build
+# time rather than by every production worker. Example:
+#
+#   python -m tornado_openapi export myapp.main:createApplication -o ./dist/swagger.json --compress
+##
+
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+from typing import Any
+import tornado
+import tornado.routing
+import tornado.web
+
+from .CachedContent import CachedContent
+from .OpenApiConfiguration import OpenApiConfiguration
+from .OpenApiHandler import OpenApiHandler
+
+
+def _findConfigurations(rules:list[tornado.routing.Rule], results:list[OpenApiConfiguration]) -> list[OpenApiConfiguration]:
+    for rule in rules:
+        if isinstance(rule.target, type) and issubclass(rule.target, OpenApiHandler):
+            config = rule.target_kwargs.get('oaconfig', None)
+            if config is not None and config not in results:
+                results.append(config)
+        elif isinstance(rule.target, tornado.web._ApplicationRouter):
+            _findConfigurations(rule.target.rules, results)
+    return results
+
+def _loadApplication(target:str) -> tornado.web.Application:
+    moduleName, _, attributeName = target.partition(':')
+    module = importlib.import_module(moduleName)
+    result:Any = getattr(module, attributeName if len(attributeName) > 0 else 'app')
+    if not isinstance(result, tornado.web.Application):
+        result = result()
+    if not isinstance(result, tornado.web.Application):
+        raise TypeError(f'"{target}" did not provide a tornado.web.Application')
+    return result
+
+def _write(path:str, content:bytes) -> None:
+    # NOTE: written to a temporary file and renamed over `path`, a server may have `path` memory mapped (see `prebuilt()`) and truncating it in place would crash the server
+    descriptor, temporaryPath = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=f'.{os.path.basename(path)}.')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(content)
+        os.chmod(temporaryPath, 0o644)
+        os.replace(temporaryPath, path)
+    except BaseException:
+        os.unlink(temporaryPath)
+        raise
+
+def export(args:argparse.Namespace) -> int:
+    """
+    Builds the OAS document for an application and writes it to disk, without binding any sockets.
+    """
+    timings = dict[str,float]()
+    started = time.perf_counter()
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    moduleName = args.target.partition(':')[0]
+    importlib.import_module(moduleName)
+    timings['import'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    app = _loadApplication(args.target)
+    timings['factory'] = time.perf_counter() - started
+
+    configurations = _findConfigurations(app.default_router.rules, list[OpenApiConfiguration]())
+    if args.pattern is not None:
+        configurations = [e for e in configurations if e.pattern == args.pattern]
+    if len(configurations) == 0:
+        print(f'error: no OpenApiConfiguration found for "{args.target}"{"" if args.pattern is None else f" with pattern {args.pattern!r}"}.', file=sys.stderr)
+        return 1
+    elif len(configurations) > 1:
+        print(f'error: multiple OpenApiConfigurations found, use --pattern to select one of: {", ".join(repr(e.pattern) for e in configurations)}', file=sys.stderr)
+        return 1
+    config = configurations[0]
+
+    document = config.cache.resolve(app)
+    timings['build'] = document.buildDuration
+    timings['serialize'] = document.serializeDuration
+
+    started = time.perf_counter()
+    content:CachedContent = document.yaml if args.output.endswith('.yaml') else document.json
+    timings['serialize'] += time.perf_counter() - started
+
+    started = time.perf_counter()
+    outputDirectory = os.path.dirname(os.path.abspath(args.output))
+    os.makedirs(outputDirectory, exist_ok=True)
+    # NOTE: sidecars are written after the document, a sidecar older than the document is ignored (see `CachedContent.load`)
+    _write(args.output, content.content)
+    outputs = [args.output]
+    if args.compress:
+        for encoding,encoded in content.encodings.items():
+            path = args.output + CachedContent.extensionFor(encoding)
+            _write(path, encoded)
+            outputs.append(path)
+    timings['write'] = time.perf_counter() - started
+
+    if not args.quiet:
+        for phase,elapsed in timings.items():
+            print(f'{phase:>10}: {elapsed*1000:8.1f}ms')
+        for path in outputs:
+            print(f'{os.path.getsize(path):>10} {path}')
+    return 0
+
+def main(argv:list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m tornado_openapi', description='Tools for tornado-openapi.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    exportCommand = commands.add_parser('export', help='Build an OAS document for an application and write it to disk.')
+    exportCommand.add_argument('target', help='The application to export, as "module:attribute". The attribute may be a tornado.web.Application, or a callable which returns one. Default attribute is "app".')
+    exportCommand.add_argument('-o', '--output', default='swagger.json', help='The output file. A ".yaml" extension writes YAML, otherwise JSON is written. Default is "swagger.json".')
+    exportCommand.add_argument('-p', '--pattern', default=None, help='The pattern of the configuration to export, required when an application has more than one.')
+    exportCommand.add_argument('-c', '--compress', action='store_true', help='Also write pre-compressed variants (such as "swagger.json.gz") for each configured encoder.')
+    exportCommand.add_argument('-q', '--quiet', action='store_true', help='Do not print timings or output files.')
+    exportCommand.set_defaults(handler=export)
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
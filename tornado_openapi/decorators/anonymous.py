@@ -20,4 +20,5 @@ def anonymous(target:Callable) -> Callable:
         MetaManager.instance().security[target] = security
     # intentionally adding an empty security requirement as an override to allow anonymous access
     security.append(SecurityRequirement())
+    MetaManager.instance().invalidate(target)
     return origin
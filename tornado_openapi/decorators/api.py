@@ -30,5 +30,6 @@ def api(tag:str = None) -> Callable:
                 MetaManager.instance().tags[target] = list[str]([tag])
             else:
                 tags.append(tag)
+        MetaManager.instance().invalidate(target)
         return origin
     return wrapper
@@ -21,4 +21,5 @@ def apiKey(target:Callable) -> Callable:
     security.append(SecurityRequirement({
         'apiKey':[]
     }))
+    MetaManager.instance().invalidate(target)
     return origin
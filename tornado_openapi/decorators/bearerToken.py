@@ -21,4 +21,5 @@ def bearerToken(target:Callable) -> Callable:
     security.append(SecurityRequirement({
         'bearerToken':[]
     }))
+    MetaManager.instance().invalidate(target)
     return origin
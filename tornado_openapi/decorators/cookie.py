@@ -37,5 +37,6 @@ def cookie(name:str, t:type = str, description:str = None, required:bool = False
         cookie.deprecated = True if deprecated == True else None
         cookie.schema = MetaManager.instance().getSchemaForType(t)
         cookies[name] = cookie
+        MetaManager.instance().invalidate(target)
         return origin
     return wrapper
@@ -37,5 +37,6 @@ def header(name:str, t:type = str, description:str = None, required:bool = False
         header.deprecated = True if deprecated == True else None
         header.schema = MetaManager.instance().getSchemaForType(t)
         headers[name] = header
+        MetaManager.instance().invalidate(target)
         return origin
     return wrapper
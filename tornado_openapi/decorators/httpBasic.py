@@ -21,4 +21,5 @@ def httpBasic(target:Callable) -> Callable:
     security.append(SecurityRequirement({
         'httpBasic':[]
     }))
+    MetaManager.instance().invalidate(target)
     return origin
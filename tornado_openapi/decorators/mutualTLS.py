@@ -21,4 +21,5 @@ def mutualTLS(target:Callable) -> Callable:
     security.append(SecurityRequirement({
         'mutualTLS':[]
     }))
+    MetaManager.instance().invalidate(target)
     return origin
@@ -22,5 +22,6 @@ def oauth2(scopes:list[str] = []) -> Callable:
         security.append(SecurityRequirement({
             'oauth2':scopes
         }))
+        MetaManager.instance().invalidate(target)
         return origin
     return wrapper
@@ -21,4 +21,5 @@ def openId(target:Callable) -> Callable:
     security.append(SecurityRequirement({
         'openIdConnect':[]
     }))
+    MetaManager.instance().invalidate(target)
     return origin
@@ -40,5 +40,6 @@ def request(t:type, contentType:str = 'application/json', encoding:str = None, d
                     encoding=MetaManager.instance().getEncoding(encoding)
                 )
             requestBody.content = content
+        MetaManager.instance().invalidate(target)
         return origin
     return wrapper
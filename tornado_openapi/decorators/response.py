@@ -55,5 +55,6 @@ def response(code:int|str, t:type = None, contentType:str = 'application/json',
             }
         # TODO: links?
         responses[code] = response
+        MetaManager.instance().invalidate(target)
         return origin
     return wrapper
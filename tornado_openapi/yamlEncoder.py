@@ -0,0 +1,78 @@
+# SPDX-FileCopyrightText: Copyright (C) Shaun Wilson
+# SPDX-License-Identifier: MIT
+
+import json
+import math
+import re
+from typing import Any
+
+_plainPattern = re.compile(r'^[A-Za-z_/][A-Za-z0-9_ ./\-]*$')
+_reservedWords = { 'true', 'false', 'null', 'yes', 'no', 'on', 'off', 'y', 'n', '~' }
+
+
+def _scalar(value:Any) -> str:
+    if value is None:
+        return 'null'
+    elif value is True:
+        return 'true'
+    elif value is False:
+        return 'false'
+    elif isinstance(value, int):
+        return str(value)
+    elif isinstance(value, float):
+        if math.isnan(value):
+            return '.nan'
+        elif math.isinf(value):
+            return '.inf' if value > 0 else '-.inf'
+        text = repr(value)
+        if '.' not in text:
+            # NOTE: YAML 1.1 parsers require a `.` in floats, otherwise `1e-05` is read back as a string
+            mantissa, _, exponent = text.partition('e')
+            text = f'{mantissa}.0' if len(exponent) == 0 else f'{mantissa}.0e{exponent}'
+        return text
+    elif isinstance(value, dict):
+        return '{}'
+    elif isinstance(value, (list, tuple)):
+        return '[]'
+    value = str(value)
+    if _plainPattern.match(value) is not None and not value.endswith(' ') and value.lower() not in _reservedWords:
+        return value
+    # NOTE: JSON string escapes are a subset of YAML double-quoted string escapes
+    return json.dumps(value, ensure_ascii=False)
+
+def _isBlock(value:Any) -> bool:
+    return isinstance(value, (dict, list, tuple)) and len(value) > 0
+
+def _emit(value:Any, indent:int, lines:list[str]) -> None:
+    pad = ' ' * indent
+    if isinstance(value, dict):
+        for k,v in value.items():
+            if _isBlock(v):
+                lines.append(f'{pad}{_scalar(k)}:')
+                _emit(v, indent + 2, lines)
+            else:
+                lines.append(f'{pad}{_scalar(k)}: {_scalar(v)}')
+    else:
+        for item in value:
+            if _isBlock(item):
+                # the first line of a nested block shares a line with its dash
+                nested = list[str]()
+                _emit(item, indent + 2, nested)
+                nested[0] = f'{pad}- {nested[0][indent + 2:]}'
+                lines.extend(nested)
+            else:
+                lines.append(f'{pad}- {_scalar(item)}')
+
+
+def yamlEncoder(value:Any) -> bytes:
+    """
+    The default YAML encoder. Emits UTF-8 encoded, block-style YAML for a JSON-compatible value without requiring any additional dependencies.
+
+    Strings are written as plain scalars when that is unambiguous, otherwise they are double-quoted.
+    """
+    if not _isBlock(value):
+        return (_scalar(value) + '\n').encode('utf-8')
+    lines = list[str]()
+    _emit(value, 0, lines)
+    lines.append('')
+    return '\n'.join(lines).encode('utf-8')